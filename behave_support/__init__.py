@@ -0,0 +1,6 @@
+"""
+Shared helpers for running the behave suites in this repository.
+
+Each suite still runs on its own with ``python -m behave`` from inside the
+suite directory; the modules here add runner modes and hooks on top of that.
+"""
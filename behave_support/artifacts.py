@@ -0,0 +1,146 @@
+"""
+Failure artifacts: what the browser looked like when a step failed.
+
+While the suite runs, only two cheap ring buffers are kept: the last
+``commands`` WebDriver commands (``Artifacts`` is a driver command listener)
+and the last steps with their timings. When a step fails, the first failure
+of each scenario is captured: a screenshot, the full DOM and the browser
+console, plus both buffers. The capture itself has to use the driver and so
+happens right away; compressing and writing the files is left to a
+background thread, so the next scenario can start.
+
+Each failure gets a directory under ``<dir>`` (default ``artifacts`` in the
+suite directory) that is linked from the failing step in the JSON report.
+Once the artifacts of a run take more than ``max_mb``, the oldest ones are
+deleted to make room.
+
+    python -m behave -D artifacts=reports/failures -D artifacts_max_mb=50
+    python -m behave -D artifacts=no
+"""
+import collections
+import gzip
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+_UNSAFE = re.compile(r"[^\w.-]+")
+# Arguments of a command worth keeping, shortened to this many characters.
+PARAM_CHARS = 200
+
+
+def _describe(params):
+    described = {}
+    for key, value in (params or {}).items():
+        if key == "sessionId":
+            continue
+        if not isinstance(value, (str, int, float, bool, type(None))):
+            value = repr(value)
+        if isinstance(value, str) and len(value) > PARAM_CHARS:
+            value = value[:PARAM_CHARS] + "..."
+        described[key] = value
+    return described
+
+
+class Artifacts(object):
+
+    def __init__(self, directory, max_mb=200, commands=50, steps=20):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.commands = collections.deque(maxlen=commands)
+        self.steps = collections.deque(maxlen=steps)
+        self.written = collections.deque()  # (directory, bytes), oldest first
+        self.total_bytes = 0
+        self.evicted = 0
+        self.captured = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._work, name="artifact-writer", daemon=True)
+        self._thread.start()
+
+    def __call__(self, command, params, seconds):
+        # The raw params are kept; they are only turned into text on failure.
+        self.commands.append((time.time(), command, params, seconds))
+
+    def record_step(self, step):
+        self.steps.append((step.keyword + " " + step.name, step.status.name, step.duration))
+
+    def capture(self, driver, scenario, step, error=None):
+        """Grabs the browser state now and returns the directory it will be written to."""
+        # The sequence number keeps two failures within a second apart.
+        self.captured += 1
+        name = "{}-{:03d}-{}-{}".format(time.strftime("%Y%m%d-%H%M%S"), self.captured,
+                                        _UNSAFE.sub("_", scenario.name).strip("_")[:80], scenario.line)
+        path = os.path.join(self.directory, name)
+        files = {"context.json.gz": json.dumps({
+            "scenario": scenario.name,
+            "feature": scenario.feature.filename,
+            "step": step.keyword + " " + step.name,
+            "error": error,
+            "url": self._try(lambda: driver.current_url),
+            "commands": [{"at": round(at, 3), "command": command, "params": _describe(params),
+                          "seconds": round(seconds, 4)} for at, command, params, seconds in self.commands],
+            "steps": [{"step": text, "status": status, "seconds": round(duration or 0.0, 4)}
+                      for text, status, duration in self.steps],
+            "console": self._try(lambda: driver.get_log("browser")),
+        }, indent=1, default=repr)}
+        dom = self._try(lambda: driver.page_source)
+        if dom:
+            files["dom.html.gz"] = dom
+        screenshot = self._try(lambda: driver.get_screenshot_as_png())
+        if screenshot:
+            files["screenshot.png"] = screenshot
+        self._queue.put((path, files))
+        return path, sorted(files)
+
+    @staticmethod
+    def _try(read):
+        try:
+            return read()
+        except (WebDriverException, AttributeError, NotImplementedError):
+            return None  # a dead browser, or a driver without this feature
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                self._write(*item)
+            except OSError as e:
+                print("[WARN] Could not write failure artifacts to {}: {}".format(item[0], e))
+
+    def _write(self, path, files):
+        os.makedirs(path, exist_ok=True)
+        size = 0
+        for name, data in files.items():
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            if name.endswith(".gz"):
+                data = gzip.compress(data, compresslevel=6)
+            with open(os.path.join(path, name), "wb") as f:
+                f.write(data)
+            size += len(data)
+        self.written.append((path, size))
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and len(self.written) > 1:
+            old, old_size = self.written.popleft()
+            shutil.rmtree(old, ignore_errors=True)
+            self.total_bytes -= old_size
+            self.evicted += 1
+
+
+def from_userdata(userdata):
+    directory = userdata.get("artifacts", "artifacts")
+    if directory.lower() in ("no", "false", "off"):
+        return None
+    return Artifacts(directory, max_mb=float(userdata.get("artifacts_max_mb", 200)),
+                     commands=userdata.getint("artifacts_commands", 50))
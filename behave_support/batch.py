@@ -0,0 +1,67 @@
+"""
+Bulk WebDriver operations that run as a single injected script.
+
+Looping over ``find_elements`` results costs one WebDriver round trip per
+element and per property read. These helpers do the whole loop inside the
+page and hand back the result in one call.
+"""
+
+HIDE_ALL = """
+var nodes = document.querySelectorAll(arguments[0]);
+for (var i = 0; i < nodes.length; i++) {
+    nodes[i].style.display = 'none';
+}
+return nodes.length;
+"""
+
+TEXTS = """
+var nodes = document.querySelectorAll(arguments[0]);
+var texts = [];
+for (var i = 0; i < nodes.length; i++) {
+    texts.push(nodes[i].innerText.trim());
+}
+return texts;
+"""
+
+# Clicks every match, then resolves once all clicked elements have left the
+# DOM, nothing has changed for quietMs, or timeoutMs has passed.
+CLICK_ALL_AND_WAIT = """
+var css = arguments[0], quietMs = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var clicked = Array.prototype.slice.call(document.querySelectorAll(css));
+if (!clicked.length) { done({clicked: 0, remaining: 0}); return; }
+var quietTimer = null, finished = false;
+function remaining() {
+    return clicked.filter(function (el) { return document.contains(el); }).length;
+}
+function finish() {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(deadline);
+    done({clicked: clicked.length, remaining: remaining()});
+}
+function settle() {
+    if (!remaining()) { finish(); return; }
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(finish, quietMs);
+}
+var observer = new MutationObserver(settle);
+observer.observe(document.body, {childList: true, subtree: true, attributes: true});
+var deadline = setTimeout(finish, timeoutMs);
+clicked.forEach(function (el) { el.click(); });
+"""
+
+
+def hide_all(driver, css):
+    return driver.execute_script(HIDE_ALL, css)
+
+
+def texts(driver, css):
+    return driver.execute_script(TEXTS, css)
+
+
+def click_all_and_wait(driver, css, quiet=1.0, timeout=5):
+    # quiet/timeout are in seconds. Returns {"clicked": n, "remaining": m}.
+    return driver.execute_async_script(CLICK_ALL_AND_WAIT, css, int(quiet * 1000), int(timeout * 1000))
@@ -0,0 +1,181 @@
+"""
+Reproducible benchmarks for the behave suites.
+
+Each suite is run N times against the replay fixtures (``-D replay=replay``)
+so the numbers do not depend on the network. For every suite the harness
+records wall time, time per scenario, Chrome startup time (from the
+profiler) and the peak RSS of the largest process in the run, and writes the
+medians to ``benchmarks/<timestamp>-<commit>.json``.
+
+The result is compared with ``benchmarks/baseline.json``; the exit status is
+1 when a suite's median wall time, Chrome startup or peak RSS regressed by
+more than ``--threshold`` (a fraction, default 0.2).
+
+Usage, from the repository root:
+
+    python -m behave_support.bench --record            # refresh the fixtures first
+    python -m behave_support.bench -n 5 ecommerce_suite test_pages_suite
+    python -m behave_support.bench --update-baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCHEMA_VERSION = 1
+SUITES = ("ecommerce_suite", "test_pages_suite", "isitchristmas", "peppers-ghost")
+# Metrics compared against the baseline; larger is worse for all of them.
+GATED_METRICS = ("wall_time", "chrome_startup", "peak_rss_kb")
+
+
+def git_commit(root):
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                                       universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def scenario_times(report_path):
+    times = {}
+    if not os.path.exists(report_path) or os.path.getsize(report_path) == 0:
+        return times
+    with open(report_path) as f:
+        for feature in json.load(f):
+            for element in feature.get("elements", []):
+                if element["type"] == "background":
+                    continue
+                name = "{}: {}".format(feature["name"] or feature["location"], element["name"])
+                times[name] = sum(s.get("result", {}).get("duration", 0) for s in element.get("steps", []))
+    return times
+
+
+def run_once(suite_dir, mode, defines=()):
+    out_dir = tempfile.mkdtemp(prefix="behave-bench-")
+    report = os.path.join(out_dir, "report.json")
+    # Learned timeouts and scenario order would make each run depend on the
+    # ones before it; keep them fixed and leave the histories alone.
+    cmd = [sys.executable, "-m", "behave", "-f", "json", "-o", report,
+           "-D", "profile={}".format(out_dir), "-D", "replay={}".format(mode),
+           "-D", "adaptive_timeouts=no", "-D", "scenario_history=no"]
+    for define in defines:
+        cmd += ["-D", define]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=suite_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # wait4 reports the resources of this run only, including reaped descendants.
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+
+    startup = None
+    profile = os.path.join(out_dir, "profile.json")
+    if os.path.exists(profile):
+        with open(profile) as f:
+            startup = json.load(f)["timings"].get("chrome_startup", {}).get("total")
+    return {
+        "returncode": proc.returncode,
+        "wall_time": wall,
+        "chrome_startup": startup,
+        # ru_maxrss is in kilobytes on Linux.
+        "peak_rss_kb": usage.ru_maxrss,
+        "scenarios": scenario_times(report),
+    }
+
+
+def _median(values):
+    values = [v for v in values if v is not None]
+    return round(statistics.median(values), 4) if values else None
+
+
+def bench_suite(suite_dir, runs, defines=()):
+    results = [run_once(suite_dir, "replay", defines) for _ in range(runs)]
+    names = sorted(set(n for r in results for n in r["scenarios"]))
+    return {
+        "runs": runs,
+        "failed_runs": sum(1 for r in results if r["returncode"] != 0),
+        "wall_time": _median([r["wall_time"] for r in results]),
+        "wall_times": [round(r["wall_time"], 4) for r in results],
+        "chrome_startup": _median([r["chrome_startup"] for r in results]),
+        "peak_rss_kb": _median([r["peak_rss_kb"] for r in results]),
+        "scenarios": {n: _median([r["scenarios"].get(n) for r in results]) for n in names},
+    }
+
+
+def compare(current, baseline, threshold):
+    regressions = []
+    for suite, result in current["suites"].items():
+        base = baseline.get("suites", {}).get(suite)
+        if not base:
+            continue
+        for metric in GATED_METRICS:
+            now, before = result.get(metric), base.get(metric)
+            if now is None or not before:
+                continue
+            change = (now - before) / float(before)
+            if change > threshold:
+                regressions.append("{} {}: {} -> {} (+{:.0%})".format(suite, metric, before, now, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("suites", nargs="*", default=list(SUITES))
+    parser.add_argument("-n", "--runs", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--results-dir", default="benchmarks")
+    parser.add_argument("--record", action="store_true",
+                        help="record fresh fixtures for every suite before benchmarking")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("-D", "--define", action="append", default=[],
+                        help="extra userdata passed to every run")
+    args = parser.parse_args(argv)
+    root = os.getcwd()
+
+    result = {
+        "schema": SCHEMA_VERSION,
+        "commit": git_commit(root),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "suites": {},
+    }
+    for suite in args.suites:
+        suite_dir = os.path.abspath(suite)
+        if args.record:
+            print("[bench] recording fixtures for {}".format(suite))
+            run_once(suite_dir, "record", args.define)
+        print("[bench] {} x{}".format(suite, args.runs))
+        result["suites"][suite] = bench_suite(suite_dir, args.runs, args.define)
+        print("[bench]   wall {wall_time}s, chrome startup {chrome_startup}s, peak rss {peak_rss_kb} kB".format(
+            **result["suites"][suite]))
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = os.path.join(args.results_dir, "{}-{}.json".format(
+        result["timestamp"].replace(":", "").replace("-", ""), result["commit"]))
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+    print("[bench] results written to {}".format(path))
+
+    baseline_path = os.path.join(args.results_dir, "baseline.json")
+    if args.update_baseline or not os.path.exists(baseline_path):
+        with open(baseline_path, "w") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+        print("[bench] baseline updated")
+        return 0
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline.get("schema") != SCHEMA_VERSION:
+        print("[bench] baseline uses schema {}, expected {}; rerun with --update-baseline".format(
+            baseline.get("schema"), SCHEMA_VERSION))
+        return 1
+    regressions = compare(result, baseline, args.threshold)
+    for line in regressions:
+        print("[REGRESSION] " + line)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Driver construction shared by every suite's environment.py.
+"""
+import time
+
+import behave_webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.support import expected_conditions as EC
+
+from behave_support import virtual_time, waits
+
+# Element commands that often load another page (a link, a form).
+NAVIGATING_COMMANDS = frozenset([Command.CLICK_ELEMENT, Command.SUBMIT_ELEMENT])
+
+
+class Chrome(behave_webdriver.Chrome):
+    """
+    behave_webdriver's Chrome with a hook for rewriting the URLs steps open.
+
+    Every callable in ``url_rewriters`` takes a URL and returns the URL that is
+    actually loaded, so ``driver.get(...)`` calls in the step files can be
+    pointed somewhere else without touching the steps.
+
+    ``page_version`` goes up every time the driver itself loads a page and
+    after every element click or submit, which may have loaded one, so
+    anything caching element handles knows when to drop them without asking
+    the browser. Pages changed by scripts show up as stale handles instead.
+
+    Callables in ``command_listeners`` are called as
+    ``listener(command, params, seconds)`` after every WebDriver command.
+
+    With ``ready_selector`` set, ``get`` only returns once an element matching
+    it is in the page (see load_profiles.py).
+    """
+    command_listeners = ()
+
+    def __init__(self, *args, **kwargs):
+        super(Chrome, self).__init__(*args, **kwargs)
+        self.url_rewriters = []
+        self.command_listeners = []
+        self.page_version = 0
+        self.ads_blocked = False
+        self.virtual_clock = None
+        self.user_data_dir = None
+        self.startup_time = None
+        self.blocked_urls = []
+        self.ready_selector = None
+        self.ready_timeout = 10
+
+    def execute(self, driver_command, params=None):
+        if driver_command in NAVIGATING_COMMANDS:
+            self.page_version += 1
+        if not self.command_listeners:
+            return super(Chrome, self).execute(driver_command, params)
+        start = time.time()
+        try:
+            return super(Chrome, self).execute(driver_command, params)
+        finally:
+            elapsed = time.time() - start
+            for listener in self.command_listeners:
+                listener(driver_command, params, elapsed)
+
+    def rewrite_url(self, url):
+        for rewrite in self.url_rewriters:
+            url = rewrite(url)
+        return url
+
+    def get(self, url):
+        self.page_version += 1
+        super(Chrome, self).get(self.rewrite_url(url))
+        if self.ready_selector:
+            locator = (By.CSS_SELECTOR, self.ready_selector)
+            waits.TimedWait(self, self.ready_timeout, label="page_ready").until(EC.presence_of_element_located(locator))
+
+    def refresh(self):
+        self.page_version += 1
+        return super(Chrome, self).refresh()
+
+    def back(self):
+        self.page_version += 1
+        return super(Chrome, self).back()
+
+    def forward(self):
+        self.page_version += 1
+        return super(Chrome, self).forward()
+
+    def pause(self, milliseconds):
+        # With a virtual clock installed, pausing just advances page time.
+        if self.virtual_clock is not None and virtual_time.tick(self, milliseconds) is not None:
+            return
+        super(Chrome, self).pause(milliseconds)
+
+
+def chrome_options(proxy=None, user_data_dir=None):
+    options = ChromeOptions()
+    if user_data_dir:
+        # A cloned template profile (see profiles.py); skip the first-run work
+        # and background traffic that would otherwise write into it.
+        options.add_argument("--user-data-dir={}".format(user_data_dir))
+        options.add_argument("--no-first-run")
+        options.add_argument("--no-default-browser-check")
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--disable-sync")
+    if proxy:
+        options.add_argument("--proxy-server={}".format(proxy))
+        # Route localhost through the proxy as well and keep Chrome from
+        # upgrading the proxied http:// URLs back to https://.
+        options.add_argument("--proxy-bypass-list=<-loopback>")
+        options.add_argument("--disable-features=HttpsUpgrades,HttpsFirstBalancedModeAutoEnable")
+    return options
+
+
+def build_driver(window_size=None, proxy=None, user_data_dir=None, page_load_strategy="normal",
+                 performance_log=False):
+    options = chrome_options(proxy=proxy, user_data_dir=user_data_dir)
+    options.set_capability("pageLoadStrategy", page_load_strategy)
+    # The console for failure artifacts, network events for har.py.
+    logging_prefs = {"browser": "ALL"}
+    if performance_log:
+        logging_prefs["performance"] = "ALL"
+    options.set_capability("goog:loggingPrefs", logging_prefs)
+    driver = Chrome.headless(chrome_options=options)
+    driver.user_data_dir = user_data_dir
+    if window_size:
+        driver.set_window_size(*window_size)
+    return driver
+
+
+def reset_state(driver):
+    # Forget cookies, storage and extra windows without restarting Chrome.
+    for handle in driver.window_handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(driver.window_handles[0])
+    try:
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    except WebDriverException:
+        pass  # about:blank and data: pages have no storage
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    driver.get("about:blank")
+
+
+class LazyDriver(object):
+    """
+    Stands in for a driver that is built the first time anything touches it.
+
+    Attribute reads and writes are forwarded to ``factory()``'s driver, so
+    runs whose steps never reach the browser (undefined steps, skipped
+    scenarios) never pay for starting one. Setup that should happen once the
+    browser exists can be queued with ``when_started``.
+    """
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_driver", None)
+        object.__setattr__(self, "_pending", [])
+
+    @property
+    def started(self):
+        return self._driver is not None
+
+    def resolve(self):
+        if self._driver is None:
+            object.__setattr__(self, "_driver", self._factory())
+            pending, self._pending[:] = list(self._pending), []
+            for callback in pending:
+                callback(self._driver)
+        return self._driver
+
+    def when_started(self, callback):
+        if self.started:
+            callback(self._driver)
+        else:
+            self._pending.append(callback)
+
+    def cancel_pending(self, callback):
+        if callback in self._pending:
+            self._pending.remove(callback)
+
+    def release(self):
+        # Hands back the running driver; the next use builds a new one.
+        driver = self._driver
+        object.__setattr__(self, "_driver", None)
+        return driver
+
+    def quit(self):
+        if self.started:
+            self._driver.quit()
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.resolve(), name, value)
@@ -0,0 +1,45 @@
+"""
+Files that several behave processes of one run update at the same time.
+
+``parallel.py`` and ``load.py`` start many workers in the same suite
+directory, and each of them writes its histories back in ``after_all``.
+``update_json`` reads, changes and writes such a file while holding an
+exclusive lock on ``<path>.lock``, and writes through a temporary file of
+its own, so no worker loses another one's update or replaces the file with a
+half-written one.
+"""
+import contextlib
+import fcntl
+import json
+import os
+import tempfile
+
+
+@contextlib.contextmanager
+def locked(path):
+    # Held until the with block ends, or the process dies.
+    with open(path + ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def update_json(path, update):
+    """Calls update(data) with the file's content ({} if missing) and writes data back."""
+    with locked(path):
+        data = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+        update(data)
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
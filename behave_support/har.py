@@ -0,0 +1,251 @@
+"""
+Per-scenario network capture from Chrome's performance log.
+
+Enabled with ``-D har=<dir>``: Chrome is started with network events in its
+performance log, and after every step the hooks fetch the new events (a
+single WebDriver call, which has to be made from the thread running the
+steps) and hand them to a background thread. That thread turns them into
+HAR entries and, once the scenario is over, writes
+``<dir>/<feature>--<scenario>-<line>.har``.
+
+For every step the thread also sums up its traffic: number of requests,
+bytes transferred, the slowest URLs and the share of request time spent on
+third-party hosts, i.e. hosts outside the domains of the pages the scenario
+navigated to. The hooks attach that summary to the step in the JSON report.
+
+    python -m behave -D har=reports/har
+"""
+import datetime
+import json
+import os
+import queue
+import re
+import threading
+from urllib.parse import parse_qsl, urlsplit
+
+SLOWEST = 5
+# Seconds after_scenario waits for the step summaries.
+END_TIMEOUT = 30
+_UNSAFE = re.compile(r"[^\w.-]+")
+
+
+def site(host):
+    # Good enough for the shops under test: the last two labels of the host.
+    return ".".join((host or "").split(".")[-2:])
+
+
+def _headers(headers):
+    return [{"name": name, "value": value} for name, value in (headers or {}).items()]
+
+
+def _http_version(protocol):
+    return {"h2": "HTTP/2", "h3": "HTTP/3", "http/1.0": "HTTP/1.0"}.get(protocol, "HTTP/1.1")
+
+
+class Request(object):
+    """One request while its Network.* events come in."""
+
+    def __init__(self, step, params):
+        self.step = step
+        self.request = params["request"]
+        self.type = params.get("type")
+        self.start = params["timestamp"]
+        self.wall_time = params.get("wallTime")
+        self.end = None
+        self.response = None
+        self.size = 0
+        self.error = None
+
+    @property
+    def url(self):
+        return self.request["url"]
+
+    @property
+    def duration(self):
+        # Milliseconds; requests that never finished count as 0.
+        return max(0.0, ((self.end or self.start) - self.start) * 1000)
+
+    def har_entry(self):
+        response = self.response or {}
+        timing = response.get("timing") or {}
+        wait = receive = send = 0.0
+        if timing:
+            send = max(0.0, timing.get("sendEnd", 0) - timing.get("sendStart", 0))
+            wait = max(0.0, timing.get("receiveHeadersEnd", 0) - timing.get("sendEnd", 0))
+            headers_at = (timing["requestTime"] - self.start) * 1000 + timing.get("receiveHeadersEnd", 0)
+            receive = max(0.0, self.duration - headers_at)
+        started = datetime.datetime.fromtimestamp(self.wall_time or 0, datetime.timezone.utc)
+        entry = {
+            "startedDateTime": started.isoformat().replace("+00:00", "Z"),
+            "time": round(self.duration, 3),
+            "request": {
+                "method": self.request.get("method", "GET"),
+                "url": self.url,
+                "httpVersion": _http_version(response.get("protocol")),
+                "headers": _headers(self.request.get("headers")),
+                "queryString": [{"name": k, "value": v} for k, v in parse_qsl(urlsplit(self.url).query)],
+                "cookies": [],
+                "headersSize": -1,
+                "bodySize": len(self.request.get("postData", "")),
+            },
+            "response": {
+                "status": response.get("status", 0),
+                "statusText": response.get("statusText", self.error or ""),
+                "httpVersion": _http_version(response.get("protocol")),
+                "headers": _headers(response.get("headers")),
+                "cookies": [],
+                "content": {"size": self.size, "mimeType": response.get("mimeType", "")},
+                "redirectURL": (response.get("headers") or {}).get("location", ""),
+                "headersSize": -1,
+                "bodySize": self.size,
+            },
+            "cache": {},
+            "timings": {"send": round(send, 3), "wait": round(wait, 3), "receive": round(receive, 3)},
+            "_resourceType": self.type,
+            "_step": self.step,
+        }
+        if response.get("remoteIPAddress"):
+            entry["serverIPAddress"] = response["remoteIPAddress"]
+        return entry
+
+
+class Scenario(object):
+    """The requests of one scenario, built from its performance log events."""
+
+    def __init__(self, name):
+        self.name = name
+        self.running = {}
+        self.done = []
+        self.sites = set()
+
+    def add(self, step, entries):
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            method, params = message["method"], message.get("params", {})
+            if method.startswith("Network."):
+                self._event(step, method, params)
+
+    def _event(self, step, method, params):
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            previous = self.running.pop(request_id, None)
+            if previous is not None and "redirectResponse" in params:
+                # A redirect reuses the request id; the first hop ends here.
+                previous.response = params["redirectResponse"]
+                previous.end = params["timestamp"]
+                self.done.append(previous)
+            request = self.running[request_id] = Request(step, params)
+            if request.type == "Document":
+                self.sites.add(site(urlsplit(request.url).hostname))
+            return
+        request = self.running.get(request_id)
+        if request is None:
+            return
+        if method == "Network.responseReceived":
+            request.response = params["response"]
+        elif method == "Network.dataReceived":
+            request.size += params.get("encodedDataLength", 0)
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            if params.get("encodedDataLength"):
+                request.size = params["encodedDataLength"]
+            request.error = params.get("errorText")
+            request.end = params["timestamp"]
+            self.done.append(self.running.pop(request_id))
+
+    def requests(self):
+        return self.done + list(self.running.values())
+
+    def summaries(self):
+        steps = {}
+        for request in self.requests():
+            steps.setdefault(request.step, []).append(request)
+        return {step: self.summary(requests) for step, requests in steps.items()}
+
+    def summary(self, requests):
+        total = sum(r.duration for r in requests)
+        third_party = sum(r.duration for r in requests if site(urlsplit(r.url).hostname) not in self.sites)
+        slowest = sorted(requests, key=lambda r: r.duration, reverse=True)[:SLOWEST]
+        return {
+            "requests": len(requests),
+            "failed": sum(1 for r in requests if r.error),
+            "bytes": sum(r.size for r in requests),
+            "third_party_time_share": round(third_party / total, 3) if total else 0.0,
+            "slowest": [{"url": r.url, "ms": round(r.duration, 1)} for r in slowest],
+        }
+
+    def har(self):
+        return {"log": {
+            "version": "1.2",
+            "creator": {"name": "behave_support.har", "version": "1"},
+            "pages": [],
+            "entries": [r.har_entry() for r in sorted(self.requests(), key=lambda r: r.start)],
+        }}
+
+
+class HarRecorder(object):
+    """Builds and writes the HAR files on a background thread."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._work, name="har-writer", daemon=True)
+        self._thread.start()
+
+    def start_scenario(self, name):
+        self._queue.put(("start", name))
+
+    def add(self, step, entries):
+        if entries:
+            self._queue.put(("events", (step, entries)))
+
+    def end_scenario(self):
+        # Waits for the step summaries; the HAR file is written afterwards.
+        done = queue.Queue(maxsize=1)
+        self._queue.put(("end", done))
+        try:
+            return done.get(timeout=END_TIMEOUT)
+        except queue.Empty:
+            print("[WARN] No network summaries after {} s; the HAR writer is stuck".format(END_TIMEOUT))
+            return {}
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _work(self):
+        scenario = None
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            kind, value = item
+            try:
+                if kind == "start":
+                    scenario = Scenario(value)
+                elif kind == "events" and scenario is not None:
+                    try:
+                        scenario.add(*value)
+                    except (KeyError, TypeError, ValueError) as e:
+                        print("[WARN] Skipped unreadable performance log entries: {}".format(e))
+                elif kind == "end":
+                    # end_scenario() is blocked on this; always answer it.
+                    finished, scenario = scenario, None
+                    summaries = {}
+                    try:
+                        summaries = finished.summaries() if finished else {}
+                    finally:
+                        value.put(summaries)
+                    if finished is not None:
+                        self._write(finished)
+            except Exception as e:
+                # Losing one scenario's capture must not stop the thread the run waits on.
+                print("[WARN] HAR capture failed: {!r}".format(e))
+
+    def _write(self, scenario):
+        path = os.path.join(self.directory, _UNSAFE.sub("_", scenario.name).strip("_")[:150] + ".har")
+        try:
+            with open(path, "w") as f:
+                json.dump(scenario.har(), f)
+        except OSError as e:
+            print("[WARN] Could not write {}: {}".format(path, e))
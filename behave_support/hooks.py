@@ -0,0 +1,320 @@
+"""
+behave hooks shared by the suites.
+
+Each suite's environment.py calls into these so the runner modes configured
+with ``-D`` userdata work the same way everywhere.
+"""
+import functools
+import os
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from behave_support import (artifacts, blocking, har, lifecycle, load, perf, profiler, profiles, replay, report,
+                            schedule, session_cache, step_index, timeouts, transport, virtual_time, waits)
+from behave_support.driver import LazyDriver, build_driver, reset_state
+from behave_support.http_driver import HttpDriver
+from behave_support.load_profiles import NORMAL, PROFILES, for_scenario
+from behave_support.schedule import SHARED_STATE_TAG
+
+# behave_support.multi sets this to a dict so suites run one after another in
+# the same process share their browsers and one replay proxy; see close_shared().
+shared = None
+
+
+def before_all(context, window_size=None, load_profiles=None):
+    userdata = context.config.userdata
+    context.replay_server = _replay_server(context)
+    context.session_cache = session_cache.from_userdata(userdata)
+    context.profiler = profiler.Profiler() if userdata.get("profile") else None
+    context.transport_timer = transport.TransportTimer() if context.profiler else None
+    context.perf_collector = perf.Collector() if userdata.getbool("perf_metrics", False) else None
+    context.har = har.HarRecorder(userdata["har"]) if userdata.get("har") else None
+    context.lifecycle = lifecycle.from_userdata(userdata)
+    context.artifacts = artifacts.from_userdata(userdata)
+    context.scenario_history, context.schedule = schedule.from_userdata(userdata)
+    waits.policy = timeouts.from_userdata(userdata)
+    if userdata.getbool("step_index", True):
+        step_index.install(context._runner.step_registry)
+
+    target = userdata.get("target")
+    context.retarget = load.retarget(target) if target else None
+    context.window_size = window_size
+    context.load_profiles = dict(PROFILES, **(load_profiles or {}))
+    # Chrome starts on the first step that touches the driver, not here.
+    context.drivers = {"http": _setup_driver(context, HttpDriver(proxy=_proxy(context)))}
+    context.browser_setup = functools.partial(_attach_browser, context)
+    context.behave_driver = _browser(context)
+
+
+def _replay_server(context):
+    mode = context.config.userdata.get("replay")
+    if not mode:
+        return None
+    fixtures = context.config.userdata.get("fixtures", os.path.join(os.getcwd(), "fixtures"))
+    store = replay.FixtureStore(os.path.abspath(fixtures))
+    if shared is None:
+        return replay.ReplayServer(mode, store).start()
+    # The shared browser was launched against this proxy; keep it and point
+    # it at the current suite's fixtures.
+    if "replay_server" not in shared:
+        shared["replay_server"] = replay.ReplayServer(mode, store).start()
+    shared["replay_server"].store = store
+    return shared["replay_server"]
+
+
+def _browser(context, strategy="normal"):
+    # One browser per page-load strategy, which Chrome fixes at startup.
+    key = "browser" if strategy == "normal" else "browser:" + strategy
+    if key in context.drivers:
+        return context.drivers[key]
+    if shared is not None and key in shared:
+        browser = shared[key]
+    else:
+        browser = LazyDriver(lambda: start_browser(context, strategy))
+        if shared is not None:
+            shared[key] = browser
+    browser.when_started(context.browser_setup)
+    context.drivers[key] = browser
+    return browser
+
+
+def _browsers(context):
+    return [driver for key, driver in context.drivers.items() if key.startswith("browser")]
+
+
+def _proxy(context):
+    return context.replay_server.proxy_url if context.replay_server else None
+
+
+def _setup_driver(context, driver):
+    # Applies the run mode (target, replay, profiling) to a driver.
+    if context.retarget:
+        driver.url_rewriters.append(context.retarget)
+    if context.replay_server:
+        driver.url_rewriters.append(replay.downgrade)
+    if context.profiler:
+        driver.command_listeners.append(context.profiler.on_command)
+    if context.artifacts:
+        driver.command_listeners.append(context.artifacts)
+    return driver
+
+
+def _attach_browser(context, driver):
+    # Runs once the browser exists, again for every suite sharing it.
+    _setup_driver(context, driver)
+    if context.window_size:
+        driver.set_window_size(*context.window_size)
+    if context.profiler and driver.startup_time is not None:
+        context.profiler.record("chrome_startup", driver.startup_time)
+    if context.transport_timer:
+        context.transport_timer.attach(driver)
+    driver.startup_time = None
+
+
+def _detach_browser(context, driver):
+    if context.retarget in driver.url_rewriters:
+        driver.url_rewriters.remove(context.retarget)
+    if context.replay_server and replay.downgrade in driver.url_rewriters:
+        driver.url_rewriters.remove(replay.downgrade)
+    if context.profiler and context.profiler.on_command in driver.command_listeners:
+        driver.command_listeners.remove(context.profiler.on_command)
+    if context.transport_timer:
+        context.transport_timer.detach(driver)
+    if context.artifacts in driver.command_listeners:
+        driver.command_listeners.remove(context.artifacts)
+
+
+def _recycle_browser(context, browser):
+    driver = browser.release()
+    try:
+        driver.quit()
+    except WebDriverException:
+        pass  # it may be the browser that stopped answering
+    profiles.remove(driver.user_data_dir)
+    browser.when_started(context.browser_setup)
+
+
+def _check_browser(context, name, browser):
+    sample = context.lifecycle.after_scenario(name, browser, functools.partial(_recycle_browser, context))
+    report.attach(context, "browser", sample)
+
+
+def start_browser(context, page_load_strategy="normal"):
+    userdata = context.config.userdata
+    start = time.time()
+    user_data_dir = profiles.from_userdata(userdata)
+    try:
+        driver = build_driver(proxy=_proxy(context), user_data_dir=user_data_dir,
+                              page_load_strategy=page_load_strategy, performance_log=bool(userdata.get("har")))
+    except Exception:
+        profiles.remove(user_data_dir)
+        raise
+    if userdata.getbool("pooled_transport", True):
+        transport.install(driver)
+    driver.startup_time = time.time() - start
+    if userdata.getbool("block_ads", True):
+        patterns = blocking.load_blocklist(userdata.get("blocklist", blocking.DEFAULT_BLOCKLIST))
+        blocking.block_urls(driver, patterns)
+    perf.install(driver)
+    return driver
+
+
+def _browser_started(context):
+    return isinstance(context.behave_driver, LazyDriver) and context.behave_driver.started
+
+
+def _network_events(context):
+    return context.behave_driver.get_log("performance") if _browser_started(context) else []
+
+
+def uses_http_backend(context, scenario):
+    return "http_backend" in scenario.effective_tags and context.config.userdata.getbool("http_backend", True)
+
+
+def before_feature(context, feature):
+    schedule.reorder(feature, context.scenario_history, context.schedule)
+    if context.replay_server:
+        name = os.path.splitext(os.path.basename(feature.filename))[0]
+        context.replay_server.store.use(name)
+
+
+def before_scenario(context, scenario):
+    context.scenario_started = time.time()
+    context.failure_captured = False
+    del waits.history[:]
+    if waits.policy:
+        waits.policy.start_scenario()
+    context.load_profile = None
+    if uses_http_backend(context, scenario):
+        context.behave_driver = context.drivers["http"]
+    else:
+        profile = NORMAL
+        if context.config.userdata.getbool("load_profiles", True):
+            profile = for_scenario(scenario, context.load_profiles)
+        context.behave_driver = _browser(context, profile.strategy)
+        if profile is not NORMAL:
+            context.load_profile = profile
+            context.behave_driver.when_started(profile.apply)
+        if "virtual_time" in scenario.effective_tags and context.config.userdata.getbool("virtual_time", True):
+            context.behave_driver.when_started(virtual_time.install)
+        if context.config.userdata.get("browser_start", "step") == "scenario":
+            # Keeps Chrome's startup out of the first browser step's duration.
+            context.behave_driver.resolve()
+    if context.profiler:
+        context.profiler.start_scenario(scenario)
+    if context.har:
+        _network_events(context)  # left over from before this scenario
+        context.har_steps = list(scenario.all_steps)
+        context.har.start_scenario("{}--{}-{}".format(
+            scenario.feature.name or scenario.feature.filename, scenario.name, scenario.line))
+
+
+def after_scenario(context, scenario):
+    key = schedule.scenario_key(os.path.relpath(scenario.feature.filename), scenario.name)
+    context.scenario_history.record(key, time.time() - context.scenario_started, scenario.status.name)
+    browser = context.behave_driver
+    if isinstance(browser, LazyDriver):
+        if browser.started:
+            virtual_time.uninstall(browser)
+            if context.load_profile:
+                context.load_profile.reset(browser)
+        browser.cancel_pending(virtual_time.install)
+        if context.load_profile:
+            browser.cancel_pending(context.load_profile.apply)
+    if context.har:
+        for index, summary in sorted(context.har.end_scenario().items()):
+            report.attach(context, "network", summary, step=index)
+    # @shared_state features keep their browser as it is until they are done.
+    if context.lifecycle and _browser_started(context) and SHARED_STATE_TAG not in scenario.feature.tags:
+        _check_browser(context, scenario.name, context.behave_driver)
+    if context.config.userdata.getbool("wait_report") and waits.history:
+        print(waits.report())
+
+
+def after_feature(context, feature):
+    if context.lifecycle and SHARED_STATE_TAG in feature.tags:
+        for browser in _browsers(context):
+            if browser.started:
+                _check_browser(context, feature.name, browser)
+
+
+def before_step(context, step):
+    if context.profiler:
+        context.profiler.start_step(step)
+
+
+def after_step(context, step):
+    if context.profiler:
+        context.profiler.end_step(step)
+    if context.artifacts:
+        context.artifacts.record_step(step)
+        # The innermost failing step only, not the steps that ran it.
+        if step.status.name == "failed" and not context.failure_captured:
+            context.failure_captured = True
+            _capture_failure(context, step)
+    if context.perf_collector and _browser_started(context):
+        metrics = context.perf_collector.new_page(context.behave_driver)
+        if metrics:
+            report.attach(context, "performance", metrics)
+    if context.har:
+        # Steps run through execute_steps() count towards their caller.
+        index = next((i for i, s in enumerate(context.har_steps) if s is step), None)
+        if index is not None:
+            context.har.add(index, _network_events(context))
+
+
+def _capture_failure(context, step):
+    driver = context.behave_driver
+    if isinstance(driver, LazyDriver) and not driver.started:
+        driver = None  # don't start a browser just to photograph it
+    path, files = context.artifacts.capture(driver, context.scenario, step, step.error_message)
+    links = "\n".join("file://" + os.path.join(path, name) for name in files)
+    report.attach(context, "failure artifacts", links, mime_type="text/uri-list")
+
+
+def after_all(context):
+    for browser in _browsers(context):
+        browser.cancel_pending(context.browser_setup)
+        if shared is not None:
+            # The next suite gets the same browser, minus this suite's state.
+            if browser.started:
+                _detach_browser(context, browser)
+                reset_state(browser)
+        elif browser.started:
+            browser.quit()
+            profiles.remove(browser.user_data_dir)
+    if context.har:
+        context.har.close()
+    if context.artifacts:
+        context.artifacts.close()
+    if waits.policy:
+        waits.policy.save()
+    context.scenario_history.save()
+    if context.profiler:
+        context.profiler.sections["transport"] = context.transport_timer.report()
+        if context.lifecycle:
+            context.profiler.sections["browser_lifecycle"] = context.lifecycle.history
+        context.profiler.write(context.config.userdata["profile"])
+    if context.replay_server:
+        misses = context.replay_server.misses
+        if misses:
+            print("[WARN] {} request(s) had no recorded fixture, e.g. {}".format(len(misses), misses[0]))
+        if shared is None:
+            context.replay_server.stop()
+        else:
+            del misses[:]
+
+
+def close_shared():
+    # Called by behave_support.multi once the last suite has run.
+    if not shared:
+        return
+    for key in [key for key in shared if key.startswith("browser")]:
+        browser = shared.pop(key)
+        if browser.started:
+            browser.quit()
+            profiles.remove(browser.user_data_dir)
+    server = shared.pop("replay_server", None)
+    if server is not None:
+        server.stop()
@@ -0,0 +1,357 @@
+"""
+A browser-free driver for scenarios that only read the served HTML.
+
+``HttpDriver`` fetches pages with ``HttpSession`` and parses them with the
+standard library's ``html.parser``, so a scenario that just opens a URL and
+checks elements or text runs without starting Chrome. It implements the part
+of the ``behave_webdriver`` API those steps use:
+
+* ``get``/``open_url``, ``current_url``, ``title`` and ``page_source``
+* ``find_element(s)`` by CSS selector, tag name, id, class name, name and
+  link text, on the driver and on elements
+* ``element.text``, ``get_attribute``, ``get_property("value")``,
+  ``is_displayed`` and behave_webdriver's checks built on them, such as
+  ``element_contains``
+
+CSS selectors support type, ``#id``, ``.class``, ``[attr]`` and
+``[attr<op>value]`` selectors combined with descendant and ``>`` combinators
+and ``,`` groups. JavaScript never runs, so anything that depends on script,
+XPath or layout needs the browser.
+
+Scenarios opt in with the ``@http_backend`` tag; ``-D http_backend=no`` runs
+them in Chrome anyway.
+"""
+import re
+import time
+from html.parser import HTMLParser
+
+from behave_webdriver.driver import BehaveDriverMixin
+from selenium.common.exceptions import InvalidSelectorException, NoSuchElementException, WebDriverException
+from selenium.webdriver.common.by import By
+
+from behave_support.http_session import HttpSession
+
+VOID_ELEMENTS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+])
+# An open element of a key's kind is closed implicitly by a new sibling in the value set.
+IMPLIED_END = {
+    "p": frozenset(["p", "div", "ul", "ol", "table", "h1", "h2", "h3", "h4", "h5", "h6", "form", "section"]),
+    "li": frozenset(["li"]),
+    "option": frozenset(["option"]),
+    "tr": frozenset(["tr"]),
+    "td": frozenset(["td", "th", "tr"]),
+    "th": frozenset(["td", "th", "tr"]),
+    "dt": frozenset(["dt", "dd"]),
+    "dd": frozenset(["dt", "dd"]),
+}
+HIDDEN_TEXT = frozenset(["script", "style", "noscript", "template", "head"])
+BLOCK_ELEMENTS = frozenset([
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "fieldset", "figure", "footer",
+    "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section",
+    "table", "tr", "ul",
+])
+VALUE_ELEMENTS = frozenset(["input", "button", "option", "select", "textarea", "li", "param", "data", "output"])
+
+_SELECTOR_TOKEN = re.compile(r"""
+    (?P<comb>\s*>\s*|\s+)
+  | (?P<tag>\*|[a-zA-Z][\w-]*)
+  | \#(?P<id>[\w-]+)
+  | \.(?P<cls>[\w-]+)
+  | \[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[~^$*|]?=)\s*(?P<val>"[^"]*"|'[^']*'|[^\]\s]+)\s*)?\]
+""", re.X)
+
+_ATTR_TESTS = {
+    None: lambda actual, expected: True,
+    "=": lambda actual, expected: actual == expected,
+    "~=": lambda actual, expected: expected in actual.split(),
+    "^=": lambda actual, expected: bool(expected) and actual.startswith(expected),
+    "$=": lambda actual, expected: bool(expected) and actual.endswith(expected),
+    "*=": lambda actual, expected: bool(expected) and expected in actual,
+    "|=": lambda actual, expected: actual == expected or actual.startswith(expected + "-"),
+}
+
+
+def _simple_test(match):
+    if match.group("tag"):
+        tag = match.group("tag").lower()
+        return lambda node: tag == "*" or node.tag_name == tag
+    if match.group("id"):
+        value = match.group("id")
+        return lambda node: node.attrs.get("id") == value
+    if match.group("cls"):
+        value = match.group("cls")
+        return lambda node: value in (node.attrs.get("class") or "").split()
+    name, op, expected = match.group("attr").lower(), match.group("op"), match.group("val") or ""
+    if expected[:1] in "\"'":
+        expected = expected[1:-1]
+    test = _ATTR_TESTS[op]
+    return lambda node: name in node.attrs and test(node.attrs[name] or "", expected)
+
+
+def compile_selector(selector):
+    # Returns one [(combinator, [tests])] list per comma-separated group.
+    groups = []
+    for group in selector.split(","):
+        group = group.strip()
+        compounds, combinator, pos = [], None, 0
+        while pos < len(group):
+            match = _SELECTOR_TOKEN.match(group, pos)
+            if match is None:
+                raise InvalidSelectorException(
+                    "The HTTP backend cannot handle {!r} in selector {!r}".format(group[pos:], selector))
+            pos = match.end()
+            if match.group("comb") is not None:
+                combinator = match.group("comb").strip() or " "
+                continue
+            if combinator is not None or not compounds:
+                compounds.append((combinator, []))
+                combinator = None
+            compounds[-1][1].append(_simple_test(match))
+        if not compounds:
+            raise InvalidSelectorException("Empty selector {!r}".format(selector))
+        groups.append(compounds)
+    return groups
+
+
+def _matches(node, compounds, index):
+    combinator, tests = compounds[index]
+    if not all(test(node) for test in tests):
+        return False
+    if index == 0:
+        return True
+    parent = node.parent
+    if combinator == ">":
+        return parent is not None and parent.parent is not None and _matches(parent, compounds, index - 1)
+    while parent is not None and parent.parent is not None:
+        if _matches(parent, compounds, index - 1):
+            return True
+        parent = parent.parent
+    return False
+
+
+class HttpElement(object):
+
+    def __init__(self, tag_name, attrs=None, parent=None):
+        self.tag_name = tag_name
+        self.attrs = dict(attrs or {})
+        self.parent = parent
+        self.children = []
+
+    def __repr__(self):
+        return "<HttpElement {}>".format(self.tag_name)
+
+    def iter(self):
+        for child in self.children:
+            if isinstance(child, HttpElement):
+                yield child
+                for descendant in child.iter():
+                    yield descendant
+
+    def _text_parts(self):
+        for child in self.children:
+            if isinstance(child, HttpElement):
+                if child.tag_name in HIDDEN_TEXT:
+                    continue
+                block = child.tag_name in BLOCK_ELEMENTS
+                if block:
+                    yield "\n"
+                for part in child._text_parts():
+                    yield part
+                if block:
+                    yield "\n"
+            else:
+                yield re.sub(r"\s+", " ", child)
+
+    @property
+    def text(self):
+        # Roughly what Selenium returns: one line per block, whitespace collapsed.
+        lines = (" ".join(line.split()) for line in "".join(self._text_parts()).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+    def get_attribute(self, name):
+        if name not in self.attrs:
+            return None
+        # Boolean attributes such as <input disabled> have no value.
+        return "true" if self.attrs[name] is None else self.attrs[name]
+
+    def get_property(self, name):
+        if name == "value" and self.tag_name in VALUE_ELEMENTS:
+            if self.tag_name == "textarea":
+                return "".join(child for child in self.children if not isinstance(child, HttpElement))
+            return self.attrs.get("value") or ""
+        return self.get_attribute(name)
+
+    def is_displayed(self):
+        # No layout here: hidden only when the markup says so.
+        node = self
+        while node is not None and node.parent is not None:
+            style = (node.attrs.get("style") or "").replace(" ", "").lower()
+            if "hidden" in node.attrs or "display:none" in style or node.tag_name in HIDDEN_TEXT:
+                return False
+            node = node.parent
+        return not (self.tag_name == "input" and self.attrs.get("type") == "hidden")
+
+    def find_elements(self, by=By.CSS_SELECTOR, value=None):
+        if by == By.CSS_SELECTOR:
+            groups = compile_selector(value)
+            return [node for node in self.iter() if any(_matches(node, c, len(c) - 1) for c in groups)]
+        if by == By.TAG_NAME:
+            return [node for node in self.iter() if node.tag_name == value.lower()]
+        if by == By.ID:
+            return [node for node in self.iter() if node.attrs.get("id") == value]
+        if by == By.NAME:
+            return [node for node in self.iter() if node.attrs.get("name") == value]
+        if by == By.CLASS_NAME:
+            return [node for node in self.iter() if value in (node.attrs.get("class") or "").split()]
+        if by == By.LINK_TEXT:
+            return [node for node in self.iter() if node.tag_name == "a" and node.text == value]
+        if by == By.PARTIAL_LINK_TEXT:
+            return [node for node in self.iter() if node.tag_name == "a" and value in node.text]
+        raise InvalidSelectorException("The HTTP backend does not support locating by {}".format(by))
+
+    def find_element(self, by=By.CSS_SELECTOR, value=None):
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException("No element matches {} {!r}".format(by, value))
+        return found[0]
+
+    def find_element_by_css_selector(self, css_selector):
+        return self.find_element(By.CSS_SELECTOR, css_selector)
+
+    def find_elements_by_css_selector(self, css_selector):
+        return self.find_elements(By.CSS_SELECTOR, css_selector)
+
+    def find_element_by_xpath(self, xpath):
+        return self.find_element(By.XPATH, xpath)
+
+    def find_elements_by_xpath(self, xpath):
+        return self.find_elements(By.XPATH, xpath)
+
+
+class DocumentParser(HTMLParser):
+
+    def __init__(self):
+        super(DocumentParser, self).__init__(convert_charrefs=True)
+        self.document = HttpElement("#document")
+        self._open = [self.document]
+
+    def handle_starttag(self, tag, attrs):
+        closes = self._open[-1].tag_name
+        if closes in IMPLIED_END and tag in IMPLIED_END[closes]:
+            self._open.pop()
+        element = HttpElement(tag, attrs, parent=self._open[-1])
+        self._open[-1].children.append(element)
+        if tag not in VOID_ELEMENTS:
+            self._open.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        element = HttpElement(tag, attrs, parent=self._open[-1])
+        self._open[-1].children.append(element)
+
+    def handle_endtag(self, tag):
+        # Stray end tags are ignored, unclosed children are closed with their parent.
+        for index in range(len(self._open) - 1, 0, -1):
+            if self._open[index].tag_name == tag:
+                del self._open[index:]
+                return
+
+    def handle_data(self, data):
+        self._open[-1].children.append(data)
+
+
+def parse_html(markup):
+    parser = DocumentParser()
+    parser.feed(markup)
+    parser.close()
+    return parser.document
+
+
+class HttpDriver(BehaveDriverMixin, object):
+    """
+    Stands in for ``behave_support.driver.Chrome`` in ``@http_backend``
+    scenarios. ``url_rewriters`` and ``command_listeners`` work the same way;
+    page loads are reported to the listeners as ``get`` commands.
+    """
+
+    def __init__(self, proxy=None, timeout=30, default_wait=1.5):
+        super(HttpDriver, self).__init__(default_wait=default_wait)
+        self.url_rewriters = []
+        self.command_listeners = []
+        self.page_version = 0
+        # There is no browser to load ads or run timers in.
+        self.ads_blocked = True
+        self.virtual_clock = None
+        self.session = HttpSession(proxy=proxy, rewrite_url=self.rewrite_url, timeout=timeout)
+        self.response = None
+        self.current_url = "about:blank"
+        self.page_source = ""
+        self._document = parse_html("")
+        self._history = []
+
+    def rewrite_url(self, url):
+        for rewrite in self.url_rewriters:
+            url = rewrite(url)
+        return url
+
+    def _load(self, url):
+        start = time.time()
+        self.response = self.session.get(url)
+        charset = self.response.headers.get_content_charset() or "utf-8"
+        self.page_source = self.response.body.decode(charset, "replace")
+        self._document = parse_html(self.page_source)
+        self.current_url = self.response.url
+        self.page_version += 1
+        elapsed = time.time() - start
+        for listener in self.command_listeners:
+            listener("get", {"url": url}, elapsed)
+
+    def get(self, url):
+        if self.response is not None:
+            self._history.append(self.current_url)
+        self._load(url)
+
+    def refresh(self):
+        self._load(self.current_url)
+
+    def back(self):
+        if self._history:
+            self._load(self._history.pop())
+
+    @property
+    def title(self):
+        found = self._document.find_elements(By.TAG_NAME, "title")
+        return found[0].text if found else ""
+
+    def find_elements(self, by=By.CSS_SELECTOR, value=None):
+        return self._document.find_elements(by, value)
+
+    def find_element(self, by=By.CSS_SELECTOR, value=None):
+        return self._document.find_element(by, value)
+
+    find_element_by_css_selector = HttpElement.find_element_by_css_selector
+    find_elements_by_css_selector = HttpElement.find_elements_by_css_selector
+    find_element_by_xpath = HttpElement.find_element_by_xpath
+    find_elements_by_xpath = HttpElement.find_elements_by_xpath
+
+    def get_cookies(self):
+        return [{"name": name, "value": value} for name, value in self.session.cookies.items()]
+
+    def add_cookie(self, cookie):
+        self.session.cookies[cookie["name"]] = cookie["value"]
+
+    def delete_cookie(self, name):
+        self.session.cookies.pop(name, None)
+
+    def delete_all_cookies(self):
+        self.session.cookies.clear()
+
+    def execute_script(self, script, *args):
+        raise WebDriverException("The HTTP backend cannot run JavaScript; remove the @http_backend tag")
+
+    execute_async_script = execute_script
+
+    def quit(self):
+        pass
+
+    close = quit
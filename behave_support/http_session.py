@@ -0,0 +1,96 @@
+"""
+A small cookie-carrying HTTP client that shares its session with the browser.
+
+Precondition steps use it to reach a starting state (items in the cart, a
+logged-in user) with a few direct requests instead of clicking through the
+UI. Cookies are copied from the driver before the requests and copied back
+afterwards, so the browser ends up in the same session.
+
+URLs go through the driver's ``rewrite_url`` and, in record/replay mode,
+through the replay proxy, so the requests hit the same target as the browser.
+"""
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookies import SimpleCookie
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Response(object):
+
+    def __init__(self, status, headers, body, url):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.url = url
+
+    @property
+    def text(self):
+        return self.body.decode("utf-8", "replace")
+
+
+class HttpSession(object):
+
+    def __init__(self, proxy=None, rewrite_url=None, timeout=30):
+        handlers = [_NoRedirect]
+        if proxy:
+            handlers.append(urllib.request.ProxyHandler({"http": proxy, "https": proxy}))
+        self._opener = urllib.request.build_opener(*handlers)
+        self._rewrite_url = rewrite_url or (lambda url: url)
+        self.timeout = timeout
+        self.cookies = {}
+
+    @classmethod
+    def for_context(cls, context):
+        driver = context.behave_driver
+        server = getattr(context, "replay_server", None)
+        session = cls(proxy=server.proxy_url if server else None,
+                      rewrite_url=getattr(driver, "rewrite_url", None))
+        session.cookies_from_driver(driver)
+        return session
+
+    def request(self, method, url, data=None, headers=None, follow_redirects=True):
+        url = self._rewrite_url(url)
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        for _ in range(10):
+            request = urllib.request.Request(url, data=body, method=method)
+            for name, value in (headers or {}).items():
+                request.add_header(name, value)
+            if self.cookies:
+                request.add_header("Cookie", "; ".join("{}={}".format(k, v) for k, v in self.cookies.items()))
+            try:
+                raw = self._opener.open(request, timeout=self.timeout)
+            except urllib.error.HTTPError as e:
+                raw = e
+            with raw:
+                response = Response(raw.status, raw.headers, raw.read(), url)
+            for header in response.headers.get_all("Set-Cookie") or []:
+                for name, morsel in SimpleCookie(header).items():
+                    self.cookies[name] = morsel.value
+            location = response.headers.get("Location")
+            if not (follow_redirects and location and 300 <= response.status < 400):
+                return response
+            url, method, body = urllib.parse.urljoin(url, location), "GET", None
+        raise AssertionError("Too many redirects requesting {}".format(url))
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, data, **kwargs):
+        return self.request("POST", url, data=data, **kwargs)
+
+    def cookies_from_driver(self, driver):
+        for cookie in driver.get_cookies():
+            self.cookies[cookie["name"]] = cookie["value"]
+
+    def cookies_to_driver(self, driver):
+        # The browser only accepts cookies for the domain it is currently on.
+        current = {c["name"]: c["value"] for c in driver.get_cookies()}
+        for name, value in self.cookies.items():
+            if current.get(name) != value:
+                driver.delete_cookie(name)
+                driver.add_cookie({"name": name, "value": value, "path": "/"})
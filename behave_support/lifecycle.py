@@ -0,0 +1,118 @@
+"""
+Keeping a long-lived browser healthy between scenarios.
+
+After every scenario ``BrowserLifecycle.after_scenario`` measures the
+resident memory of the browser's whole process tree (chromedriver and every
+Chrome process under it, read from /proc) and counts the scenarios the
+browser has served. Past ``max_rss_mb`` or ``max_scenarios`` the browser is
+recycled: it is quit, and the next step that needs one starts a fresh one.
+Otherwise cookies, storage and extra windows are cleared, which is much
+cheaper than a restart and keeps scenarios from seeing each other's
+sessions.
+
+Features tagged ``@shared_state`` rely on the page the previous scenario
+left behind, so their browser is only looked at once the whole feature is
+done.
+
+Every check is recorded with the memory, the action taken and how long it
+took; the hooks attach it to the scenario in the JSON report and, with
+``-D profile``, write the history to ``profile.json``.
+
+    python -m behave -D max_browser_rss_mb=1000 -D max_browser_scenarios=20
+    python -m behave -D browser_recycling=no      # one browser, never reset
+"""
+import os
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from behave_support.driver import reset_state
+
+
+def _children():
+    children = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open("/proc/{}/stat".format(name)) as f:
+                # The command name may contain spaces; the ppid follows its ")".
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+def _rss_kb(pid):
+    try:
+        with open("/proc/{}/status".format(pid)) as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def process_tree_rss_mb(pid):
+    # None where there is no /proc to read.
+    if pid is None or not os.path.isdir("/proc"):
+        return None
+    children = _children()
+    total, todo = 0, [pid]
+    while todo:
+        current = todo.pop()
+        total += _rss_kb(current)
+        todo.extend(children.get(current, ()))
+    return round(total / 1024.0, 1)
+
+
+def browser_pid(driver):
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return process.pid if process is not None else None
+
+
+class BrowserLifecycle(object):
+
+    def __init__(self, max_rss_mb=1500, max_scenarios=50):
+        self.max_rss_mb = max_rss_mb
+        self.max_scenarios = max_scenarios
+        self.served = {}
+        self.history = []
+
+    def after_scenario(self, name, browser, recycle):
+        # browser is a started LazyDriver; recycle(browser) quits it, so the
+        # next step that needs a browser starts a new one.
+        key = id(browser.resolve())
+        served = self.served[key] = self.served.get(key, 0) + 1
+        rss = process_tree_rss_mb(browser_pid(browser))
+        start = time.time()
+        if served >= self.max_scenarios or (rss is not None and rss >= self.max_rss_mb):
+            action = "recycled"
+            del self.served[key]
+            recycle(browser)
+        else:
+            action = "reset"
+            try:
+                reset_state(browser)
+            except WebDriverException:
+                action = "recycled"
+                del self.served[key]
+                recycle(browser)
+        sample = {
+            "scenario": name,
+            "rss_mb": rss,
+            "scenarios_served": served,
+            "action": action,
+            "seconds": round(time.time() - start, 3),
+        }
+        self.history.append(sample)
+        return sample
+
+
+def from_userdata(userdata):
+    if not userdata.getbool("browser_recycling", True):
+        return None
+    return BrowserLifecycle(max_rss_mb=float(userdata.get("max_browser_rss_mb", 1500)),
+                            max_scenarios=userdata.getint("max_browser_scenarios", 50))
@@ -0,0 +1,333 @@
+"""
+Load generation with the suites' own scenarios.
+
+``--users`` virtual users are started one after another over ``--ramp-up``
+seconds. Each one keeps running the suite's scenarios (the same units
+``parallel.py`` uses, so ``@shared_state`` features stay whole),
+round-robin from its own starting point, until
+``--duration`` seconds have passed or it has done ``--iterations`` of them.
+
+Scenarios tagged ``@http_backend`` run on the browser-free HTTP driver, one
+behave process per scenario, and any number of them may run at once. Every
+other scenario waits for one of ``--browsers`` slots, so the machine
+generating the load never runs more browsers than that. Each slot is a
+long-lived ``load_worker`` process that runs behave in-process for every
+scenario it is given and keeps one browser warm across them, reset between
+runs like between suites in ``multi.py``. Its runs start the browser in
+``before_scenario`` (``-D browser_start=scenario``) instead of on the first
+step that needs it, so a cold start (the slot's first run, or one after the
+browser was recycled) does not end up in that step's latency; it is reported
+on its own under ``browser_startup``, read from each run's profile. The time
+a scenario waits for a free slot is reported under ``queueing``, apart from
+the step latencies.
+
+``--target`` points every page the steps open at another origin, e.g. a
+local staging copy of the shop, by passing ``-D target=<url>`` to behave.
+
+Per step (by step text) the report has the number of runs, throughput,
+error rate and p50/p95/p99 latency, taken from the behave JSON reports of all
+runs. It is printed and written to ``reports/<suite>-load.json``.
+
+Usage, from the repository root:
+
+    python -m behave_support.load ecommerce_suite --users 10 --ramp-up 30 --duration 120 \\
+        --target http://localhost:8000 --browsers 3
+    python -m behave_support.load isitchristmas --users 50 --iterations 20 --tags=@http_backend
+"""
+import argparse
+import itertools
+import json
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit, urlunsplit
+
+from behave.parser import parse_file
+
+from behave_support.parallel import collect_units
+from behave_support.profiler import percentile
+
+HTTP_BACKEND_TAG = "http_backend"
+# load_worker is started from here, so that behave_support is importable.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def retarget(target):
+    # A url_rewriter sending every URL to the target's scheme and host.
+    scheme, netloc = urlsplit(target)[:2]
+
+    def rewrite(url):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            return url
+        return urlunsplit((scheme, netloc) + tuple(parts[2:]))
+    return rewrite
+
+
+def needs_browser(suite_dir, unit, defines=()):
+    if "http_backend=no" in defines:
+        return True
+    path, _, line = unit[0].partition(":")
+    feature = parse_file(os.path.join(suite_dir, path))
+    for scenario in feature.walk_scenarios():
+        if line and scenario.line != int(line):
+            continue
+        if HTTP_BACKEND_TAG not in scenario.effective_tags:
+            return True
+    return False
+
+
+class VirtualUser(threading.Thread):
+
+    def __init__(self, index, load, delay):
+        super(VirtualUser, self).__init__(name="vu-{}".format(index), daemon=True)
+        self.index = index
+        self.load = load
+        self.delay = delay
+        self.runs = []
+
+    def run(self):
+        load = self.load
+        time.sleep(self.delay)
+        units = load.units[self.index % len(load.units):] + load.units[:self.index % len(load.units)]
+        for count, (unit, browser) in enumerate(itertools.cycle(units)):
+            if time.time() >= load.deadline or (load.iterations and count >= load.iterations):
+                break
+            if browser:
+                queued = time.time()
+                slot = load.browser_slots.get()
+                try:
+                    run = load.run_unit(self.index, count, unit, slot)
+                finally:
+                    load.browser_slots.put(slot)
+                run["queued"] = run["start"] - queued
+                self.runs.append(run)
+            else:
+                self.runs.append(load.run_unit(self.index, count, unit))
+
+
+class BrowserSlot(object):
+    """A load_worker process that keeps one browser warm between the scenarios it runs."""
+
+    def __init__(self, suite_dir, log_path):
+        self.suite_dir = suite_dir
+        self.log_path = log_path
+        self.proc = None
+
+    def run(self, args):
+        if self.proc is None or self.proc.poll() is not None:
+            with open(self.log_path, "a") as log:
+                self.proc = subprocess.Popen([sys.executable, "-m", "behave_support.load_worker", self.suite_dir],
+                                             cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=log,
+                                             universal_newlines=True)
+        try:
+            self.proc.stdin.write(json.dumps(args) + "\n")
+            self.proc.stdin.flush()
+            answer = self.proc.stdout.readline()
+        except OSError:
+            answer = ""
+        if not answer:
+            # The worker died with its browser; the next run starts a new one.
+            self.proc.kill()
+            self.proc.wait()
+            return {"returncode": -1, "output": "[ERROR] load worker exited, see {}".format(self.log_path)}
+        return json.loads(answer)
+
+    def close(self):
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait()
+
+
+class Load(object):
+
+    def __init__(self, suite_dir, users, ramp_up, duration, iterations=None, browsers=2, target=None,
+                 defines=(), behave_args=()):
+        self.suite_dir = suite_dir
+        self.users = users
+        self.ramp_up = ramp_up
+        self.duration = duration
+        self.iterations = iterations
+        self.defines = list(defines) + (["target={}".format(target)] if target else [])
+        self.behave_args = list(behave_args)
+        self.units = [(unit, needs_browser(suite_dir, unit, self.defines)) for unit in collect_units(suite_dir)]
+        self.out_dir = tempfile.mkdtemp(prefix="behave-load-")
+        self.slots = [BrowserSlot(suite_dir, os.path.join(self.out_dir, "browser-{}.log".format(i)))
+                      for i in range(browsers)]
+        self.browser_slots = queue.Queue()
+        for slot in self.slots:
+            self.browser_slots.put(slot)
+        self.deadline = None
+
+    def run_unit(self, user, count, unit, slot=None):
+        # Without a browser slot, the unit runs in a behave process of its own.
+        report = os.path.join(self.out_dir, "vu-{}-{}.json".format(user, count))
+        # Scenarios under load take longer than usual; don't let them skew the
+        # learned timeouts and durations, or get cut short by them.
+        args = unit + [
+            "-f", "json", "-o", report, "-f", "null",
+            "-D", "worker=load-{}".format(user), "-D", "adaptive_timeouts=no", "-D", "scenario_history=no",
+        ]
+        profile_dir = None
+        if slot is not None:
+            profile_dir = os.path.join(self.out_dir, "vu-{}-{}".format(user, count))
+            args += ["-D", "browser_start=scenario", "-D", "profile={}".format(profile_dir)]
+        for define in self.defines:
+            args += ["-D", define]
+        args += self.behave_args
+        start = time.time()
+        if slot is None:
+            proc = subprocess.run([sys.executable, "-m", "behave"] + args, cwd=self.suite_dir,
+                                  stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+            result = {"returncode": proc.returncode, "output": proc.stdout}
+        else:
+            result = slot.run(args)
+        return dict(result, unit=unit, report=report, profile_dir=profile_dir, start=start,
+                    duration=time.time() - start)
+
+    def run(self):
+        start = time.time()
+        self.deadline = start + self.ramp_up + self.duration
+        spacing = self.ramp_up / self.users if self.users else 0
+        users = [VirtualUser(i, self, i * spacing) for i in range(self.users)]
+        for user in users:
+            user.start()
+        try:
+            for user in users:
+                user.join()
+        finally:
+            for slot in self.slots:
+                slot.close()
+        runs = [run for user in users for run in user.runs]
+        return aggregate(runs, time.time() - start)
+
+
+def browser_startup(profile_dir):
+    # Seconds spent starting Chrome in one run, None if it never started.
+    path = os.path.join(profile_dir, "profile.json") if profile_dir else None
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        startup = json.load(f)["timings"].get("chrome_startup")
+    return startup["total"] if startup else None
+
+
+def _latencies(durations):
+    return {
+        "p50": round(percentile(durations, 50), 4),
+        "p95": round(percentile(durations, 95), 4),
+        "p99": round(percentile(durations, 99), 4),
+    }
+
+
+def aggregate(runs, elapsed):
+    steps = defaultdict(lambda: {"durations": [], "errors": 0})
+    scenarios = {"runs": 0, "errors": 0, "crashes": 0}
+    startups = []
+    queued = []
+    for run in runs:
+        if "queued" in run:
+            queued.append(run["queued"])
+        startup = browser_startup(run.get("profile_dir"))
+        if startup is not None:
+            startups.append(startup)
+        scenarios["runs"] += 1
+        if run["returncode"] != 0:
+            scenarios["errors"] += 1
+        if run["returncode"] not in (0, 1):
+            # behave exits with 1 on test failures; anything else is a crash.
+            scenarios["crashes"] += 1
+        if not os.path.exists(run["report"]) or not os.path.getsize(run["report"]):
+            continue
+        with open(run["report"]) as f:
+            features = json.load(f)
+        for feature in features:
+            for element in feature.get("elements", []):
+                for step in element.get("steps", []):
+                    result = step.get("result", {})
+                    if result.get("status") not in ("passed", "failed"):
+                        continue
+                    stats = steps["{} {}".format(step["keyword"], step["name"])]
+                    stats["durations"].append(result.get("duration", 0.0))
+                    if result["status"] == "failed":
+                        stats["errors"] += 1
+
+    report = {"elapsed": round(elapsed, 2), "scenarios": scenarios, "steps": {}}
+    if elapsed:
+        scenarios["throughput"] = round(scenarios["runs"] / elapsed, 3)
+    if startups:
+        report["browser_startup"] = dict(count=len(startups), **_latencies(startups))
+    if queued:
+        report["queueing"] = dict(count=len(queued), **_latencies(queued))
+    for name, stats in sorted(steps.items()):
+        durations = stats["durations"]
+        report["steps"][name] = dict(
+            count=len(durations),
+            throughput=round(len(durations) / elapsed, 3) if elapsed else 0.0,
+            error_rate=round(stats["errors"] / len(durations), 4),
+            **_latencies(durations))
+    return report
+
+
+def format_report(report):
+    lines = ["{:>7} {:>8} {:>7} {:>8} {:>8} {:>8}  {}".format(
+        "count", "per sec", "errors", "p50", "p95", "p99", "step")]
+    for name, s in report["steps"].items():
+        lines.append("{:>7} {:>8.2f} {:>6.1f}% {:>7.2f}s {:>7.2f}s {:>7.2f}s  {}".format(
+            s["count"], s["throughput"], s["error_rate"] * 100, s["p50"], s["p95"], s["p99"], name))
+    for key, label in (("browser_startup", "(browser startup)"), ("queueing", "(waiting for a browser)")):
+        extra = report.get(key)
+        if extra:
+            lines.append("{:>7} {:>8} {:>7} {:>7.2f}s {:>7.2f}s {:>7.2f}s  {}".format(
+                extra["count"], "", "", extra["p50"], extra["p95"], extra["p99"], label))
+    scenarios = report["scenarios"]
+    lines.append("{} scenario runs in {:.1f}s ({:.2f}/s), {} failed, {} crashed".format(
+        scenarios["runs"], report["elapsed"], scenarios.get("throughput", 0.0), scenarios["errors"],
+        scenarios["crashes"]))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("suite", help="suite directory containing a features/ folder")
+    parser.add_argument("-u", "--users", type=int, default=5, help="virtual users (default: 5)")
+    parser.add_argument("--ramp-up", type=float, default=10.0,
+                        help="seconds over which the users are started (default: 10)")
+    parser.add_argument("--duration", type=float, default=60.0,
+                        help="seconds to keep going once every user has started (default: 60)")
+    parser.add_argument("--iterations", type=int, default=None, help="stop each user after this many scenarios")
+    parser.add_argument("--browsers", type=int, default=2,
+                        help="browser slots, each running one warm Chrome at a time (default: 2)")
+    parser.add_argument("--target", default=None, help="origin to send every request to, e.g. http://localhost:8000")
+    parser.add_argument("-o", "--output", default=None,
+                        help="JSON report (default: reports/<suite>-load.json)")
+    parser.add_argument("-D", "--define", action="append", default=[],
+                        help="userdata passed through to every run, e.g. -D replay=replay")
+    # Anything not recognised here (--tags, ...) goes to behave.
+    args, behave_args = parser.parse_known_args(argv)
+    suite_dir = os.path.abspath(args.suite)
+    load = Load(suite_dir, args.users, args.ramp_up, args.duration, args.iterations, args.browsers,
+                args.target, args.define, behave_args)
+    if not load.units:
+        print("[ERROR] No scenarios found in {}".format(suite_dir))
+        return 1
+    report = load.run()
+
+    output = os.path.abspath(args.output or os.path.join(
+        "reports", "{}-load.json".format(os.path.basename(suite_dir.rstrip(os.sep)))))
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(format_report(report))
+    print("Report written to {}".format(output))
+    return 1 if report["scenarios"]["crashes"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Page-load profiles chosen per scenario or feature with a ``@load_<name>`` tag.
+
+A profile says three things about the pages a scenario opens:
+
+* ``strategy``, Chrome's page-load strategy: ``normal`` waits for every
+  image, font and frame, ``eager`` returns at DOMContentLoaded and ``none``
+  returns as soon as the navigation has started;
+* ``suppress``, asset types (see ``ASSETS``) that are blocked at the network
+  level, on top of the ad blocklist, for the duration of the scenario;
+* ``ready``, a CSS selector ``driver.get`` waits for before returning, so a
+  scenario that stops waiting for the load event still knows the part of the
+  page it asserts on is there.
+
+The page-load strategy is fixed when Chrome starts, so a strategy other than
+``normal`` gets a browser of its own, started the first time a scenario with
+that strategy touches it. Profiles that keep ``normal`` share the usual one.
+
+Suites add their own profiles through ``hooks.before_all(context,
+load_profiles={...})``; a scenario tag wins over a feature tag.
+
+    @load_no_assets
+    Scenario: View all products
+
+    python -m behave -D load_profiles=no      # every scenario loads pages normally
+"""
+from behave_support import blocking
+
+ASSETS = {
+    "images": ("*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"),
+    "media": ("*.mp4*", "*.webm*", "*.ogg*", "*.mp3*", "*.m4a*", "*.wav*"),
+    "fonts": ("*.woff*", "*.ttf*", "*.otf*", "*.eot*", "*fonts.googleapis.com*", "*fonts.gstatic.com*"),
+}
+STRATEGIES = ("normal", "eager", "none")
+TAG_PREFIX = "load_"
+
+
+class LoadProfile(object):
+
+    def __init__(self, strategy="normal", suppress=(), ready="body", ready_timeout=10):
+        if strategy not in STRATEGIES:
+            raise ValueError("Unknown page-load strategy {!r}, expected one of {}".format(strategy, STRATEGIES))
+        unknown = set(suppress) - set(ASSETS)
+        if unknown:
+            raise ValueError("Unknown asset type(s) {}, expected some of {}".format(sorted(unknown), sorted(ASSETS)))
+        if strategy == "none" and not ready:
+            raise ValueError("The 'none' page-load strategy needs a ready selector")
+        self.strategy = strategy
+        self.suppress = tuple(suppress)
+        self.ready = ready
+        self.ready_timeout = ready_timeout
+
+    def blocked_patterns(self):
+        return [pattern for asset in self.suppress for pattern in ASSETS[asset]]
+
+    def apply(self, driver):
+        if self.suppress:
+            blocking.set_blocked_urls(driver, list(driver.blocked_urls) + self.blocked_patterns())
+        driver.ready_selector = self.ready
+        driver.ready_timeout = self.ready_timeout
+
+    def reset(self, driver):
+        if self.suppress:
+            blocking.set_blocked_urls(driver, driver.blocked_urls)
+        driver.ready_selector = None
+
+    def __repr__(self):
+        return "LoadProfile({!r}, suppress={!r}, ready={!r})".format(self.strategy, self.suppress, self.ready)
+
+
+NORMAL = LoadProfile(ready=None)
+PROFILES = {
+    "normal": NORMAL,
+    "no_assets": LoadProfile(suppress=("images", "media", "fonts")),
+    "eager": LoadProfile("eager", suppress=("images", "media", "fonts")),
+}
+
+
+def for_scenario(scenario, profiles):
+    for tags in (scenario.tags, scenario.feature.tags):
+        for tag in tags:
+            if tag.startswith(TAG_PREFIX):
+                name = tag[len(TAG_PREFIX):]
+                if name not in profiles:
+                    raise ValueError("Unknown load profile @{}, expected one of {}".format(tag, sorted(profiles)))
+                return profiles[name]
+    return NORMAL
+
@@ -0,0 +1,63 @@
+"""
+One browser slot of ``load.py``, keeping its browser warm between runs.
+
+``load.py`` starts one of these per ``--browsers`` slot. It reads one JSON
+line per scenario run from stdin, the behave arguments of that run, runs
+behave in this process the way ``multi.py`` runs suites, and answers with
+one JSON line holding the exit code (0 passed, 1 failed, 2 behave did not
+run) and the run's console output. ``hooks.shared`` keeps the browser and
+the replay proxy between runs, reset the same way as between suites, so only
+a worker's first run, or the first one after the browser was recycled, pays
+for starting Chrome.
+
+Not meant to be run by hand; ``load.py`` starts it as
+
+    python -m behave_support.load_worker ecommerce_suite
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+
+from behave.configuration import Configuration
+from behave.runner import Runner
+
+from behave_support import hooks
+from behave_support.multi import forget_modules, reset_step_registry
+
+
+def run_scenario(suite_dir, args):
+    output = io.StringIO()
+    reset_step_registry()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            failed = Runner(Configuration(command_args=args)).run()
+        returncode = 1 if failed else 0
+    except Exception as e:
+        output.write("[ERROR] behave did not run: {}\n".format(e))
+        returncode = 2
+    finally:
+        forget_modules(suite_dir)
+    return {"returncode": returncode, "output": output.getvalue()}
+
+
+def main(argv=None):
+    suite_dir = os.path.abspath((sys.argv[1:] if argv is None else argv)[0])
+    # stdout carries the answers; anything else written to it goes to stderr.
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    os.chdir(suite_dir)
+    hooks.shared = {}
+    try:
+        for line in sys.stdin:
+            channel.write(json.dumps(run_scenario(suite_dir, json.loads(line))) + "\n")
+            channel.flush()
+    finally:
+        hooks.close_shared()
+        hooks.shared = None
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
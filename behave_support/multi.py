@@ -0,0 +1,162 @@
+"""
+Run every suite in one Python process that shares one browser.
+
+The suites are run one after another with behave's own Runner. Before each
+suite the step registry is emptied and the suite-local modules of the
+previous one (``behave_webdriver.steps``, helpers such as ``pages``) are
+dropped from ``sys.modules``, so the overlapping built-in steps that every
+suite registers don't collide. ``hooks.shared`` makes the suites reuse a
+single lazily started Chrome, with cookies, storage and extra windows
+cleared in between.
+
+Each suite's JSON and JUnit output is combined into ``reports/all-suites.json``
+(the same format ``parallel.py`` writes) and ``reports/all-suites.xml``.
+
+Usage, from the repository root:
+
+    python -m behave_support.multi
+    python -m behave_support.multi ecommerce_suite test_pages_suite -D replay=replay --no-capture
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+from behave import matchers
+from behave.configuration import Configuration
+from behave.runner import Runner
+from behave.step_registry import registry
+
+from behave_support import hooks, step_index
+from behave_support.parallel import merge_reports, summarize
+
+# Step modules outside the suites that suites import; they register their
+# steps on import, so every suite has to import them afresh.
+SHARED_STEP_MODULES = ("behave_webdriver.steps", "behave_support.perf_steps")
+
+
+def discover_suites(root):
+    suites = []
+    for name in sorted(os.listdir(root)):
+        if glob.glob(os.path.join(root, name, "features", "*.feature")):
+            suites.append(os.path.join(root, name))
+    return suites
+
+
+def reset_step_registry():
+    # Cleared in place: behave.given & co. and the runner hold this registry.
+    for step_type in registry.steps:
+        del registry.steps[step_type][:]
+    matchers.current_matcher = matchers.ParseMatcher
+    step_index.invalidate(registry)
+
+
+def forget_modules(suite_dir):
+    prefix = os.path.abspath(suite_dir) + os.sep
+    for name, module in list(sys.modules.items()):
+        path = os.path.abspath(getattr(module, "__file__", None) or os.sep)
+        shared_steps = any(name == m or name.startswith(m + ".") for m in SHARED_STEP_MODULES)
+        if shared_steps or path.startswith(prefix):
+            del sys.modules[name]
+
+
+def prefix_locations(features, prefix):
+    for feature in features:
+        feature["location"] = "{}/{}".format(prefix, feature["location"])
+        for element in feature.get("elements", []):
+            element["location"] = "{}/{}".format(prefix, element["location"])
+    return features
+
+
+def run_suite(suite_dir, out_dir, stdout_format, defines=(), behave_args=()):
+    name = os.path.basename(suite_dir.rstrip(os.sep))
+    report = os.path.join(out_dir, name + ".json")
+    args = ["-f", "json", "-o", report, "-f", stdout_format,
+            "--junit", "--junit-directory", os.path.join(out_dir, "junit", name)]
+    for define in defines:
+        args += ["-D", define]
+    args += list(behave_args)
+
+    cwd = os.getcwd()
+    os.chdir(suite_dir)
+    reset_step_registry()
+    start = time.time()
+    try:
+        failed = Runner(Configuration(command_args=args)).run()
+    except Exception as e:
+        print("[ERROR] {} did not run: {}".format(name, e))
+        failed = True
+    finally:
+        os.chdir(cwd)
+        forget_modules(suite_dir)
+
+    features = []
+    if os.path.exists(report) and os.path.getsize(report):
+        with open(report) as f:
+            features = prefix_locations(json.load(f), name)
+        with open(report, "w") as f:
+            json.dump(features, f)
+    return {"name": name, "failed": failed, "report": report, "duration": time.time() - start}
+
+
+def merge_junit(junit_dir, results):
+    root = ET.Element("testsuites")
+    for result in results:
+        for path in sorted(glob.glob(os.path.join(junit_dir, result["name"], "*.xml"))):
+            testsuite = ET.parse(path).getroot()
+            testsuite.set("name", "{}.{}".format(result["name"], testsuite.get("name", "")))
+            root.append(testsuite)
+    for attr in ("tests", "errors", "failures", "skipped"):
+        root.set(attr, str(sum(int(s.get(attr, 0)) for s in root)))
+    return ET.ElementTree(root)
+
+
+def run(suites, output, stdout_format="pretty", defines=(), behave_args=()):
+    out_dir = tempfile.mkdtemp(prefix="behave-multi-")
+    start = time.time()
+    hooks.shared = {}
+    results = []
+    try:
+        for suite_dir in suites:
+            print("[suite] {}".format(os.path.basename(suite_dir.rstrip(os.sep))))
+            results.append(run_suite(suite_dir, out_dir, stdout_format, defines, behave_args))
+    finally:
+        hooks.close_shared()
+        hooks.shared = None
+
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    features = merge_reports([r["report"] for r in results])
+    with open(output + ".json", "w") as f:
+        json.dump(features, f, indent=2)
+    merge_junit(os.path.join(out_dir, "junit"), results).write(output + ".xml", encoding="utf-8",
+                                                               xml_declaration=True)
+
+    for r in results:
+        print("[suite] {} {} in {:.1f}s".format(r["name"], "failed" if r["failed"] else "passed", r["duration"]))
+    print(summarize(features))
+    print("Took {:.1f}s, reports written to {}.json and {}.xml".format(time.time() - start, output, output))
+    return 1 if any(r["failed"] for r in results) else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("suites", nargs="*",
+                        help="suite directories (default: every directory with a features/ folder)")
+    parser.add_argument("-o", "--output", default=os.path.join("reports", "all-suites"),
+                        help="report path without extension (default: reports/all-suites)")
+    parser.add_argument("-f", "--format", default="pretty", help="behave formatter for the console")
+    parser.add_argument("-D", "--define", action="append", default=[],
+                        help="userdata passed to every suite, e.g. -D replay=replay")
+    # Anything not recognised here (--no-capture, --tags, ...) goes to behave.
+    args, behave_args = parser.parse_known_args(argv)
+    suites = [os.path.abspath(s) for s in args.suites] or discover_suites(os.getcwd())
+    return run(suites, os.path.abspath(args.output), args.format, args.define, behave_args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Run a suite's scenarios across a pool of behave worker processes.
+
+Every worker is its own ``behave`` process, so ``before_all`` in the suite's
+environment.py gives each worker its own headless Chrome. The JSON reports the
+workers write are merged back into a single behave-compatible JSON report.
+
+Features tagged ``@shared_state`` (scenarios that rely on the page left behind
+by the previous scenario) are never split up and always run in one worker.
+
+Scenarios are handed out longest first, by their durations in the suite's
+scenario history (see schedule.py), always to the worker with the least work
+so far; ``--schedule file`` deals them out round-robin in file order instead.
+
+Usage, from the repository root:
+
+    python -m behave_support.parallel ecommerce_suite --workers 4
+    python -m behave_support.parallel test_pages_suite -o reports/test_pages.json --tags=~@wip
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from behave.parser import parse_file
+
+from behave_support import schedule
+from behave_support.schedule import SHARED_STATE_TAG
+
+
+def collect_units(suite_dir, features_dir="features"):
+    # A unit is the smallest list of locations that may be sent to a worker:
+    # one scenario, or a whole feature when its scenarios share browser state.
+    units = []
+    root = os.path.join(suite_dir, features_dir)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if not filename.endswith(".feature"):
+                continue
+            path = os.path.join(dirpath, filename)
+            relpath = os.path.relpath(path, suite_dir)
+            feature = parse_file(path)
+            if feature is None:
+                continue
+            if SHARED_STATE_TAG in feature.tags:
+                units.append([relpath])
+                continue
+            for scenario in feature.walk_scenarios():
+                units.append(["{}:{}".format(relpath, scenario.line)])
+    return units
+
+
+def shard(units, workers):
+    shards = [[] for _ in range(max(1, min(workers, len(units))))]
+    for index, unit in enumerate(units):
+        shards[index % len(shards)].extend(unit)
+    return shards
+
+
+def run_shard(suite_dir, index, locations, out_dir, defines, behave_args=()):
+    report = os.path.join(out_dir, "worker-{}.json".format(index))
+    log = os.path.join(out_dir, "worker-{}.log".format(index))
+    cmd = [sys.executable, "-m", "behave"] + locations + [
+        "-f", "json", "-o", report,
+        "-f", "progress", "-o", log,
+        "-D", "worker={}".format(index),
+    ]
+    for define in defines:
+        cmd += ["-D", define]
+    cmd += list(behave_args)
+    start = time.time()
+    proc = subprocess.run(cmd, cwd=suite_dir, stdout=subprocess.PIPE,
+                          stderr=subprocess.STDOUT, universal_newlines=True)
+    return {
+        "index": index,
+        "returncode": proc.returncode,
+        "report": report,
+        "output": proc.stdout,
+        "duration": time.time() - start,
+    }
+
+
+def _location_key(element):
+    path, _, line = element["location"].rpartition(":")
+    return path, int(line)
+
+
+def merge_reports(paths):
+    features = {}
+    for path in paths:
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            continue
+        with open(path) as f:
+            for feature in json.load(f):
+                merged = features.setdefault(feature["location"], dict(feature, elements=[]))
+                seen = set(_location_key(e) for e in merged["elements"])
+                for element in feature.get("elements", []):
+                    # Backgrounds are repeated in every worker's report.
+                    if _location_key(element) in seen:
+                        continue
+                    merged["elements"].append(element)
+                if feature.get("status") == "failed":
+                    merged["status"] = "failed"
+    result = []
+    for location in sorted(features):
+        feature = features[location]
+        feature["elements"].sort(key=_location_key)
+        result.append(feature)
+    return result
+
+
+def summarize(features):
+    counts = {"features": {}, "scenarios": {}, "steps": {}}
+    for feature in features:
+        status = feature.get("status", "untested")
+        counts["features"][status] = counts["features"].get(status, 0) + 1
+        for element in feature["elements"]:
+            if element["type"] != "background":
+                status = element.get("status", "untested")
+                counts["scenarios"][status] = counts["scenarios"].get(status, 0) + 1
+            for step in element.get("steps", []):
+                status = step.get("result", {}).get("status", "untested")
+                counts["steps"][status] = counts["steps"].get(status, 0) + 1
+    lines = []
+    for kind in ("features", "scenarios", "steps"):
+        c = counts[kind]
+        lines.append("{} {} passed, {} failed, {} skipped".format(
+            c.get("passed", 0), kind, c.get("failed", 0), c.get("skipped", 0)))
+    return "\n".join(lines)
+
+
+def run(suite_dir, workers, output, defines=(), behave_args=(), order="longest_first"):
+    units = collect_units(suite_dir)
+    if not units:
+        print("[ERROR] No scenarios found in {}".format(suite_dir))
+        return 1
+    if order == "longest_first":
+        history = schedule.ScenarioHistory(os.path.join(suite_dir, schedule.DEFAULT_HISTORY))
+        shards = schedule.lpt_shards(units, schedule.unit_estimates(suite_dir, units, history), workers)
+    else:
+        shards = shard(units, workers)
+    out_dir = tempfile.mkdtemp(prefix="behave-parallel-")
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+        results = list(pool.map(
+            lambda args: run_shard(suite_dir, args[0], args[1], out_dir, defines, behave_args),
+            enumerate(shards)))
+    features = merge_reports([r["report"] for r in results])
+
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(features, f, indent=2)
+
+    for r in results:
+        print("[worker {}] exit {} in {:.1f}s".format(r["index"], r["returncode"], r["duration"]))
+        if r["returncode"] not in (0, 1):
+            # behave exits with 1 on test failures; anything else is a crash.
+            print(r["output"])
+    print(summarize(features))
+    print("Took {:.1f}s with {} worker(s), report written to {}".format(
+        time.time() - start, len(shards), output))
+    return 0 if all(r["returncode"] == 0 for r in results) else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("suite", help="suite directory containing a features/ folder")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("-o", "--output", default=None,
+                        help="merged JSON report (default: reports/<suite>-parallel.json)")
+    parser.add_argument("-D", "--define", action="append", default=[],
+                        help="userdata passed through to every worker, e.g. -D replay=replay")
+    parser.add_argument("--schedule", choices=("longest_first", "file"), default="longest_first",
+                        help="how scenarios are split across workers (default: longest_first)")
+    # Anything not recognised here (--dry-run, --tags, ...) goes to behave.
+    args, behave_args = parser.parse_known_args(argv)
+    suite_dir = os.path.abspath(args.suite)
+    output = args.output or os.path.join(
+        "reports", "{}-parallel.json".format(os.path.basename(suite_dir.rstrip(os.sep))))
+    return run(suite_dir, args.workers, os.path.abspath(output), args.define, behave_args, args.schedule)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Page performance metrics from the browser's Performance API.
+
+``collect(driver)`` reads the navigation, paint and resource timing entries
+of the page that is loaded, plus its largest contentful paint, which Chrome
+only reports to a ``PerformanceObserver``: ``install`` registers one in every
+page the browser opens. All times are milliseconds since navigation start.
+
+With ``-D perf_metrics=yes`` the hooks collect the metrics after every step
+(one more WebDriver call per step) and, when the step led to a new page
+load, attach them to that step in the JSON report (see report.py). The
+assertions on them are in perf_steps.py and work either way.
+
+    python -m behave -D perf_metrics=yes    # collect after every step
+"""
+from selenium.common.exceptions import WebDriverException
+
+LCP_OBSERVER = """
+(function () {
+    window.__largestContentfulPaint = null;
+    try {
+        new PerformanceObserver(function (list) {
+            var entries = list.getEntries();
+            var last = entries[entries.length - 1];
+            window.__largestContentfulPaint = last.renderTime || last.loadTime || last.startTime;
+        }).observe({type: 'largest-contentful-paint', buffered: true});
+    } catch (e) {}
+})();
+"""
+
+COLLECT = """
+var nav = performance.getEntriesByType('navigation')[0];
+if (!nav) { return null; }
+var paints = {};
+performance.getEntriesByType('paint').forEach(function (p) { paints[p.name] = p.startTime; });
+var resources = performance.getEntriesByType('resource');
+var bytes = nav.transferSize || 0, slowest = null;
+resources.forEach(function (r) {
+    bytes += r.transferSize || 0;
+    if (!slowest || r.duration > slowest.duration) { slowest = r; }
+});
+return {
+    url: location.href,
+    timeOrigin: performance.timeOrigin,
+    ttfb: nav.responseStart,
+    domContentLoaded: nav.domContentLoadedEventEnd || null,
+    load: nav.loadEventEnd || null,
+    firstContentfulPaint: paints['first-contentful-paint'] || null,
+    largestContentfulPaint: window.__largestContentfulPaint || null,
+    resources: resources.length,
+    transferBytes: bytes,
+    slowestResource: slowest ? {url: slowest.name, duration: slowest.duration} : null
+};
+"""
+
+
+def install(driver):
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": LCP_OBSERVER})
+
+
+def collect(driver):
+    try:
+        metrics = driver.execute_script(COLLECT)
+    except WebDriverException:
+        return None  # no page, or a driver that doesn't run scripts
+    if metrics:
+        for key, value in metrics.items():
+            if isinstance(value, float) and key != "timeOrigin":
+                metrics[key] = round(value, 1)
+    return metrics
+
+
+class Collector(object):
+    """Hands out the metrics of each page load once."""
+
+    def __init__(self):
+        self.last_origin = None
+
+    def new_page(self, driver):
+        metrics = collect(driver)
+        if not metrics or metrics["timeOrigin"] == self.last_origin:
+            return None
+        self.last_origin = metrics["timeOrigin"]
+        return metrics
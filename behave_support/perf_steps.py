@@ -0,0 +1,67 @@
+"""
+Assertions on page performance, for any suite that imports them into its
+environment.py:
+
+    from behave_support.perf_steps import *
+
+    Then the page should load within 5000 ms
+    And the largest contentful paint should be under 2500 ms
+
+Both steps check the page that is loaded now, wait for the browser to report
+the metric if the page is still loading, and attach the page's metrics to the
+step in the JSON report.
+
+Timings of the live site vary with the network, its ads and its third-party
+scripts, so the budgets are only enforced when the pages come from recorded
+fixtures (``-D replay=replay``). Against the live site both steps report the
+metrics and print a note when a budget is missed, but never fail.
+"""
+from behave import then
+from selenium.common.exceptions import TimeoutException
+
+from behave_support import perf, report, waits
+
+
+def replayed(context):
+    server = getattr(context, "replay_server", None)
+    return server is not None and server.mode == "replay"
+
+
+def within_budget(context, ok, message):
+    if replayed(context):
+        assert ok, message
+    elif not ok:
+        print("[INFO] {} (only enforced with -D replay=replay)".format(message))
+
+
+def page_metrics(context, key, budget_ms, label):
+    def reported(driver):
+        metrics = perf.collect(driver)
+        return metrics if metrics and metrics.get("load") and metrics.get(key) else False
+
+    try:
+        # The budget counts from navigation start, so this rarely waits long.
+        metrics = waits.TimedWait(context.behave_driver, budget_ms / 1000.0 + 1, label=label).until(reported)
+    except TimeoutException:
+        within_budget(context, False, "The browser reported no {} for {} within {} ms".format(
+            key, context.behave_driver.current_url, budget_ms))
+        return None
+    report.attach(context, "performance", metrics)
+    return metrics
+
+
+@then('the page should load within {ms:d} ms')
+def page_should_load_within_step(context, ms):
+    metrics = page_metrics(context, "load", ms, "page_should_load_within_step")
+    if metrics:
+        within_budget(context, metrics["load"] <= ms, "{} took {:.0f} ms to load, more than {} ms".format(
+            metrics["url"], metrics["load"], ms))
+
+
+@then('the largest contentful paint should be under {ms:d} ms')
+def largest_contentful_paint_under_step(context, ms):
+    metrics = page_metrics(context, "largestContentfulPaint", ms, "largest_contentful_paint_under_step")
+    if metrics:
+        lcp = metrics["largestContentfulPaint"]
+        within_budget(context, lcp < ms, "The largest contentful paint of {} was at {:.0f} ms, not under {} ms".format(
+            metrics["url"], lcp, ms))
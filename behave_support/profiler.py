@@ -0,0 +1,121 @@
+"""
+Per-step and per-WebDriver-command latency profiling.
+
+Enabled with ``-D profile=<dir>``. Every step is timed, and every WebDriver
+command the driver sends is timed and attributed to the step that sent it.
+At the end of the run two files are written to ``<dir>``:
+
+``profile.json``
+    p50/p95/max/total per step definition and per WebDriver command type.
+
+``profile.folded``
+    Collapsed stacks (``feature;scenario;step;command microseconds``) for
+    flamegraph.pl or speedscope. Step time not spent in WebDriver commands
+    (sleeps, Python work) shows up as a ``(python)`` frame.
+"""
+import json
+import math
+import os
+import time
+from collections import defaultdict
+
+
+def percentile(values, pct):
+    # Nearest-rank percentile; values need not be sorted.
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values):
+    return {
+        "count": len(values),
+        "total": round(sum(values), 4),
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "max": round(max(values), 4) if values else 0.0,
+    }
+
+
+def step_definition(step):
+    match = getattr(step, "match", None)
+    if match is None or match.func is None:
+        return "(undefined) " + step.name
+    return "{} ({})".format(match.func.__name__, match.location)
+
+
+def _frame(text):
+    # Semicolons separate frames in the folded format.
+    return text.replace(";", ",").strip() or "(unnamed)"
+
+
+class Profiler(object):
+
+    def __init__(self):
+        self.steps = defaultdict(list)
+        self.commands = defaultdict(list)
+        self.timings = defaultdict(list)
+        self.stacks = defaultdict(float)
+        # Extra top-level entries for profile.json, e.g. transport timings.
+        self.sections = {}
+        self._scenario = ["(setup)"]
+        # [frame, seconds spent in commands] per running step; steps run
+        # through context.execute_steps() nest inside their caller.
+        self._steps = []
+
+    def _stack(self):
+        return self._scenario + [frame for frame, _ in self._steps]
+
+    def start_scenario(self, scenario):
+        self._scenario = [_frame(scenario.feature.name or scenario.feature.filename), _frame(scenario.name)]
+        self._steps = []
+
+    def start_step(self, step):
+        self._steps.append([_frame(step.keyword + " " + step.name), 0.0])
+
+    def end_step(self, step):
+        duration = step.duration or 0.0
+        self.steps[step_definition(step)].append(duration)
+        if not self._steps:
+            return
+        self.stacks[tuple(self._stack() + ["(python)"])] += max(0.0, duration - self._steps[-1][1])
+        self._steps.pop()
+        if self._steps:
+            # The nested step's whole duration is accounted for already.
+            self._steps[-1][1] += duration
+
+    def on_command(self, command, params, elapsed):
+        # Registered as a command listener on the driver.
+        self.commands[command].append(elapsed)
+        self.stacks[tuple(self._stack() + [command])] += elapsed
+        if self._steps:
+            self._steps[-1][1] += elapsed
+
+    def record(self, name, elapsed):
+        # Anything else worth timing, e.g. browser startup.
+        self.timings[name].append(elapsed)
+        self.stacks[tuple(self._stack() + [name])] += elapsed
+        if self._steps:
+            self._steps[-1][1] += elapsed
+
+    def report(self):
+        report = {
+            "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "steps": {k: summarize(v) for k, v in sorted(self.steps.items())},
+            "commands": {k: summarize(v) for k, v in sorted(self.commands.items())},
+            "timings": {k: summarize(v) for k, v in sorted(self.timings.items())},
+        }
+        report.update(self.sections)
+        return report
+
+    def write(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "profile.json"), "w") as f:
+            json.dump(self.report(), f, indent=2)
+        with open(os.path.join(directory, "profile.folded"), "w") as f:
+            for stack, seconds in sorted(self.stacks.items()):
+                micros = int(seconds * 1e6)
+                if micros:
+                    f.write("{} {}\n".format(";".join(stack), micros))
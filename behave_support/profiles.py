@@ -0,0 +1,136 @@
+"""
+Pre-warmed Chrome profiles cloned per driver.
+
+A fresh ``--user-data-dir`` makes Chrome do its first-run work (creating the
+profile databases, component setup, an empty HTTP cache) on every launch. The
+profile manager does that once: it builds a template profile, throws away the
+state that must not leak between runs (cookies, storage, history, Safe
+Browsing and GPU shader caches) and keeps the HTTP and code caches.
+
+Every driver then gets its own clone of the template on tmpfs (``/dev/shm``
+when available), copied with ``cp --reflink=auto`` so filesystems that support
+it share blocks copy-on-write. The clone is deleted when the driver quits, so
+nothing is written into the working tree.
+
+    python -m behave                                   # template in ~/.cache
+    python -m behave -D chrome_template=/tmp/template  # somewhere else
+    python -m behave -D chrome_warm_urls=https://automationexercise.com/
+    python -m behave -D chrome_profile=no              # Chrome's own temp profile
+"""
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+from behave_support import files
+
+TEMPLATE_VERSION = 1
+DEFAULT_TEMPLATE = os.path.join(os.path.expanduser("~"), ".cache", "behave_support", "chrome-template")
+SCRATCH_DIRS = ("/dev/shm",)
+MARKER = "template.json"
+
+# Per-run state removed from the template; relative to the user data dir,
+# entries under Default/ are profile state, the rest browser-wide caches.
+PRUNED = (
+    "Safe Browsing", "Crashpad", "BrowserMetrics", "ShaderCache", "GrShaderCache",
+    "GraphiteDawnCache", "DawnGraphiteCache", "DawnWebGPUCache",
+    "SingletonLock", "SingletonSocket", "SingletonCookie",
+    "Default/Cookies", "Default/Cookies-journal", "Default/Safe Browsing Cookies",
+    "Default/Safe Browsing Cookies-journal", "Default/Local Storage", "Default/Session Storage",
+    "Default/Sessions", "Default/IndexedDB", "Default/History", "Default/History-journal",
+    "Default/Login Data", "Default/Login Data-journal", "Default/Web Data", "Default/Web Data-journal",
+    "Default/DawnWebGPUCache", "Default/DawnGraphiteCache", "Default/GPUCache",
+)
+
+
+def scratch_dir():
+    for path in SCRATCH_DIRS:
+        if os.path.isdir(path) and os.access(path, os.W_OK):
+            return path
+    return tempfile.gettempdir()
+
+
+def is_current(template):
+    try:
+        with open(os.path.join(template, MARKER)) as f:
+            return json.load(f).get("version") == TEMPLATE_VERSION
+    except (OSError, ValueError):
+        return False
+
+
+def prune(user_data_dir):
+    for name in PRUNED:
+        path = os.path.join(user_data_dir, *name.split("/"))
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.lexists(path):
+            os.remove(path)
+
+
+def build_template(template, warm_urls=()):
+    # Launch Chrome once on a scratch profile, visit the warm-up pages so the
+    # HTTP cache is populated, then move the pruned profile into place. Only
+    # call it holding files.locked(template), see ensure_template().
+    from behave_support.driver import build_driver
+
+    parent = os.path.dirname(os.path.abspath(template))
+    os.makedirs(parent, exist_ok=True)
+    work = tempfile.mkdtemp(prefix=".chrome-template-", dir=parent)
+    try:
+        driver = build_driver(user_data_dir=work)
+    except Exception:
+        shutil.rmtree(work, ignore_errors=True)
+        raise
+    try:
+        for url in warm_urls:
+            driver.get(url)
+    finally:
+        driver.quit()
+    prune(work)
+    with open(os.path.join(work, MARKER), "w") as f:
+        json.dump({"version": TEMPLATE_VERSION, "warm_urls": list(warm_urls)}, f)
+    # An outdated template; no worker clones it, they all wait for this one.
+    if os.path.exists(template):
+        shutil.rmtree(template, ignore_errors=True)
+    os.rename(work, template)
+    return template
+
+
+def ensure_template(template=DEFAULT_TEMPLATE, warm_urls=()):
+    if is_current(template):
+        return template
+    # Parallel workers starting without a template build it once: the first
+    # one builds, the others wait for the lock and then find it current.
+    os.makedirs(os.path.dirname(os.path.abspath(template)), exist_ok=True)
+    with files.locked(template):
+        if not is_current(template):
+            build_template(template, warm_urls)
+    return template
+
+
+def clone(template):
+    target = tempfile.mkdtemp(prefix="behave-chrome-", dir=scratch_dir())
+    source = os.path.join(template, ".")
+    try:
+        subprocess.check_call(["cp", "-a", "--reflink=auto", source, target],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        # No GNU cp (e.g. macOS); a plain copy is still cheaper than a cold start.
+        shutil.rmtree(target, ignore_errors=True)
+        shutil.copytree(template, target, symlinks=True)
+    return target
+
+
+def remove(user_data_dir):
+    if user_data_dir:
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+
+
+def from_userdata(userdata):
+    # Returns the path of a fresh clone, or None when -D chrome_profile is off.
+    if not userdata.getbool("chrome_profile", True):
+        return None
+    warm_urls = [u for u in userdata.get("chrome_warm_urls", "").split(",") if u]
+    template = ensure_template(os.path.abspath(userdata.get("chrome_template", DEFAULT_TEMPLATE)), warm_urls)
+    return clone(template)
@@ -0,0 +1,238 @@
+"""
+Record/replay of the HTTP traffic the suites generate.
+
+Chrome is started with this module's local server as its HTTP proxy and the
+URLs steps open are downgraded from https:// to http://, so every page load
+goes through the proxy in plain HTTP:
+
+* ``record`` mode forwards each request to the real site over https and saves
+  the response in the fixture store.
+* ``replay`` mode answers from the fixture store only and never touches the
+  network; anything that was not recorded gets a 404.
+
+Fixtures are kept per feature under ``<fixtures>/<feature name>/``: an
+``index.json`` keyed by method and URL plus one file per response body.
+Requests with a body are also keyed by its hash, leaving out form fields such
+as ``csrfmiddlewaretoken`` that change on every page load. Several behave
+processes recording into the same directory update ``index.json`` under a
+lock (``files.update_json``), so none of them drops the others' entries.
+
+Enable it from the command line of any suite:
+
+    python -m behave -D replay=record
+    python -m behave -D replay=replay -D fixtures=/path/to/fixtures
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from behave_support import files
+
+MODES = ("record", "replay")
+
+# Hop-by-hop headers and headers that stop an https page working over http.
+DROPPED_HEADERS = {
+    "connection", "keep-alive", "transfer-encoding", "content-length",
+    "content-encoding", "strict-transport-security", "content-security-policy",
+    "content-security-policy-report-only", "alt-svc", "proxy-connection",
+}
+TEXT_TYPES = ("text/", "javascript", "json", "xml")
+# Form fields holding a per-page token, so a replayed POST would never match.
+TOKEN_FIELDS = frozenset([
+    "csrfmiddlewaretoken", "csrf_token", "_csrf", "_token", "authenticity_token", "__RequestVerificationToken",
+])
+
+
+def downgrade(url):
+    # Used as a url_rewriter on the driver.
+    if url.startswith("https://"):
+        return "http://" + url[len("https://"):]
+    return url
+
+
+def upgrade(url):
+    if url.startswith("http://"):
+        return "https://" + url[len("http://"):]
+    return url
+
+
+def strip_tokens(body):
+    # Form-encoded bodies lose their TOKEN_FIELDS; anything else is left as is.
+    try:
+        fields = urllib.parse.parse_qsl(body.decode("utf-8"), keep_blank_values=True, strict_parsing=True)
+    except (UnicodeDecodeError, ValueError):
+        return body
+    kept = [(name, value) for name, value in fields if name not in TOKEN_FIELDS]
+    if len(kept) == len(fields):
+        return body
+    return urllib.parse.urlencode(kept).encode("utf-8")
+
+
+class FixtureStore(object):
+
+    def __init__(self, root):
+        self.root = root
+        self.current = None
+        self.index = {}
+        self._lock = threading.Lock()
+
+    def use(self, name):
+        # Switch to the fixture directory of a feature.
+        with self._lock:
+            self.current = os.path.join(self.root, name)
+            path = os.path.join(self.current, "index.json")
+            self.index = {}
+            if os.path.exists(path):
+                with open(path) as f:
+                    self.index = json.load(f)
+
+    @staticmethod
+    def key(method, url, body=b""):
+        key = "{} {}".format(method, url)
+        body = strip_tokens(body) if body else body
+        if body:
+            key += " " + hashlib.sha1(body).hexdigest()[:12]
+        return key
+
+    def lookup(self, method, url, body=b""):
+        with self._lock:
+            entry = self.index.get(self.key(method, url, body))
+            if entry is None:
+                return None
+            with open(os.path.join(self.current, entry["body"]), "rb") as f:
+                content = f.read()
+        return entry["status"], entry["headers"], content
+
+    def save(self, method, url, body, status, headers, content):
+        with self._lock:
+            if self.current is None:
+                return
+            os.makedirs(self.current, exist_ok=True)
+            name = hashlib.sha1(content).hexdigest() + ".body"
+            with open(os.path.join(self.current, name), "wb") as f:
+                f.write(content)
+            key = self.key(method, url, body)
+            entry = {
+                "status": status,
+                "headers": headers,
+                "body": name,
+            }
+
+            def merge(index):
+                # Also picks up what other processes recorded meanwhile.
+                index[key] = entry
+                self.index = index
+            files.update_json(os.path.join(self.current, "index.json"), merge)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Redirects are recorded and handed back to the browser as-is.
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def fetch(method, url, headers, body):
+    request = urllib.request.Request(upgrade(url), data=body or None, method=method)
+    for name, value in headers:
+        if name.lower() not in DROPPED_HEADERS and name.lower() not in ("host", "accept-encoding"):
+            request.add_header(name, value)
+    request.add_header("Accept-Encoding", "identity")
+    try:
+        response = _opener.open(request, timeout=30)
+    except urllib.error.HTTPError as e:
+        response = e
+    with response:
+        return response.status, list(response.headers.items()), response.read()
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _url(self):
+        if self.path.startswith("http://"):
+            return self.path
+        return "http://{}{}".format(self.headers.get("Host", ""), self.path)
+
+    def _handle(self):
+        server = self.server
+        url = self._url()
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        hit = server.store.lookup(self.command, url, body)
+        if hit is None and server.mode == "record":
+            try:
+                hit = fetch(self.command, url, self.headers.items(), body)
+            except Exception as e:
+                print("[WARN] Could not record {} {}: {}".format(self.command, url, e))
+            else:
+                server.store.save(self.command, url, body, *hit)
+        if hit is None:
+            server.misses.append(url)
+            return self._respond(404, [("Content-Type", "text/plain")], b"not recorded")
+        self._respond(*hit)
+
+    def _respond(self, status, headers, content):
+        content_type = ""
+        self.send_response(status)
+        for name, value in headers:
+            lower = name.lower()
+            if lower in DROPPED_HEADERS:
+                continue
+            if lower == "content-type":
+                content_type = value
+            elif lower == "location":
+                value = downgrade(value)
+            elif lower == "set-cookie":
+                # Secure cookies would be dropped by the browser over http.
+                value = re.sub(r";\s*(Secure|SameSite=None)\b", "", value, flags=re.I)
+            self.send_header(name, value)
+        if any(t in content_type for t in TEXT_TYPES):
+            content = content.replace(b"https://", b"http://")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(content)
+
+    def do_CONNECT(self):
+        # Only plain HTTP goes through the proxy; tunnels would hit the network.
+        self.send_error(403, "https is not proxied")
+
+    do_GET = do_POST = do_HEAD = do_PUT = do_DELETE = do_OPTIONS = _handle
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, mode, store, address=("127.0.0.1", 0)):
+        if mode not in MODES:
+            raise ValueError("replay mode must be one of {}, got {!r}".format(MODES, mode))
+        ThreadingHTTPServer.__init__(self, address, ProxyHandler)
+        self.mode = mode
+        self.store = store
+        self.misses = []
+        self._thread = None
+
+    @property
+    def proxy_url(self):
+        return "http://{}:{}".format(*self.server_address[:2])
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,45 @@
+"""
+Attachments in behave's JSON report.
+
+``attach(context, name, data)`` adds ``data`` to the step that is running, or
+to the last step of the scenario when called from ``after_scenario``, or to
+``step``, an index into the scenario's steps including the background, as a
+Cucumber-style embedding: ``{"name", "mime_type", "data"}`` with the data
+base64-encoded. Dicts and lists are stored as JSON. behave's own
+``embedding()`` can't be used for this because it doesn't run on Python 3.
+
+Nothing happens when the run has no JSON formatter.
+"""
+import base64
+import json
+
+from behave.formatter.json import JSONFormatter
+
+
+def _current_step(formatter, index=None):
+    if not formatter.current_feature_data or not formatter.current_feature_data.get("elements"):
+        return None
+    steps = formatter.current_feature_element["steps"]
+    if not steps:
+        return None
+    if index is None:
+        # The formatter's index points at the step that is running.
+        index = formatter._step_index
+    return steps[min(index, len(steps) - 1)]
+
+
+def attach(context, name, data, mime_type=None, step=None):
+    if isinstance(data, (dict, list)):
+        data, mime_type = json.dumps(data, sort_keys=True), mime_type or "application/json"
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    for formatter in getattr(context._runner, "formatters", ()):
+        if not isinstance(formatter, JSONFormatter):
+            continue
+        step_data = _current_step(formatter, step)
+        if step_data is not None:
+            step_data.setdefault("embeddings", []).append({
+                "name": name,
+                "mime_type": mime_type or "text/plain",
+                "data": base64.b64encode(data).decode("ascii"),
+            })
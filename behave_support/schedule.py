@@ -0,0 +1,157 @@
+"""
+Scenario history and the run order it suggests.
+
+Every scenario's wall time (hooks included) and outcome are kept per feature
+file and scenario name in ``.scenario_history.json`` in the suite directory,
+the last ``MAX_RUNS`` runs each. With ``-D schedule=`` set, ``before_feature``
+reorders the feature's scenarios from that history:
+
+``file`` (the default)
+    The order of the feature file.
+``fail_fast``
+    Scenarios that failed recently first, most recent failures first, then
+    everything else cheapest first, so a broken build shows up early.
+``longest_first``
+    The slowest scenarios first.
+
+Scenarios without history are assumed to take the median time. Features
+tagged ``@shared_state`` always keep their order. ``parallel.py`` uses the
+same estimates to hand out scenarios to workers longest first (LPT), so the
+workers finish at about the same time.
+
+    python -m behave -D schedule=fail_fast
+    python -m behave -D scenario_history=/tmp/history.json
+    python -m behave -D scenario_history=no     # neither read nor written
+"""
+import json
+import os
+import statistics
+
+from behave.parser import parse_file
+
+from behave_support import files
+
+DEFAULT_HISTORY = ".scenario_history.json"
+MAX_RUNS = 20
+MODES = ("fail_fast", "longest_first", "file")
+SHARED_STATE_TAG = "shared_state"
+
+
+def scenario_key(filename, name):
+    # Names rather than lines, so that editing a feature keeps its history.
+    return "{}::{}".format(filename, name)
+
+
+class ScenarioHistory(object):
+
+    def __init__(self, path=None):
+        self.path = path
+        self.runs = {}
+        self.new_runs = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.runs.update(json.load(f))
+
+    def record(self, key, seconds, status):
+        run = {"seconds": round(seconds, 3), "status": status}
+        for runs in (self.runs.setdefault(key, []), self.new_runs.setdefault(key, [])):
+            runs.append(run)
+            del runs[:-MAX_RUNS]
+
+    def expected_duration(self, key):
+        runs = self.runs.get(key)
+        if not runs:
+            return None
+        return statistics.median(run["seconds"] for run in runs[-5:])
+
+    def failure_score(self, key):
+        # 1 for a failure in the latest run, halving with every run since.
+        runs = self.runs.get(key, ())
+        return sum(0.5 ** age for age, run in enumerate(reversed(runs)) if run["status"] == "failed")
+
+    def default_duration(self):
+        known = [self.expected_duration(key) for key in self.runs]
+        return statistics.median(known) if known else 0.0
+
+    def save(self):
+        if not self.path or not self.new_runs:
+            return
+        # Merge with what other workers wrote since this run loaded the file.
+        def merge(merged):
+            for key, runs in self.new_runs.items():
+                merged[key] = (merged.get(key, []) + runs)[-MAX_RUNS:]
+        files.update_json(self.path, merge)
+        self.new_runs.clear()
+
+
+class Estimate(object):
+    """Expected duration and failure score of a group of scenarios."""
+
+    def __init__(self, history, keys, default):
+        durations = [history.expected_duration(key) for key in keys]
+        self.duration = sum(default if d is None else d for d in durations)
+        self.failure_score = max([history.failure_score(key) for key in keys] or [0.0])
+
+
+def _keys(filename, entry):
+    # A Scenario Outline stands for all of its generated scenarios.
+    children = getattr(entry, "scenarios", None) or [entry]
+    return [scenario_key(filename, s.name) for s in children]
+
+
+def sort_key(estimate, mode):
+    if mode == "fail_fast":
+        return (-estimate.failure_score, estimate.duration)
+    if mode == "longest_first":
+        return -estimate.duration
+    return 0
+
+
+def reorder(feature, history, mode):
+    if mode == "file" or SHARED_STATE_TAG in feature.tags:
+        return
+    default = history.default_duration()
+    filename = os.path.relpath(feature.filename)
+    estimates = {id(entry): Estimate(history, _keys(filename, entry), default)
+                 for entry in feature.scenarios}
+    # sort() is stable, so ties keep the file order.
+    feature.scenarios.sort(key=lambda entry: sort_key(estimates[id(entry)], mode))
+
+
+def unit_estimates(suite_dir, units, history):
+    # Estimates for parallel.collect_units() units: "path:line" or a whole file.
+    default = history.default_duration()
+    features = {}
+    estimates = []
+    for unit in units:
+        keys = []
+        for location in unit:
+            path, _, line = location.partition(":")
+            if path not in features:
+                features[path] = parse_file(os.path.join(suite_dir, path))
+            for scenario in features[path].walk_scenarios():
+                if not line or scenario.line == int(line):
+                    keys.append(scenario_key(path, scenario.name))
+        estimates.append(Estimate(history, keys, default))
+    return estimates
+
+
+def lpt_shards(units, estimates, workers):
+    # Longest processing time first: each unit goes to the least loaded shard.
+    shards = [{"load": 0.0, "locations": []} for _ in range(max(1, min(workers, len(units))))]
+    for unit, estimate in sorted(zip(units, estimates), key=lambda pair: -pair[1].duration):
+        # Without any history all loads are 0; then the unit count decides.
+        shard = min(shards, key=lambda s: (s["load"], len(s["locations"])))
+        shard["load"] += estimate.duration
+        shard["locations"].extend(unit)
+    return [shard["locations"] for shard in shards]
+
+
+def from_userdata(userdata):
+    path = userdata.get("scenario_history", DEFAULT_HISTORY)
+    if path.lower() in ("no", "false", "off"):
+        path = None
+    mode = userdata.get("schedule", "file")
+    if mode not in MODES:
+        raise ValueError("Unknown schedule {!r}, expected one of {}".format(mode, MODES))
+    return ScenarioHistory(os.path.abspath(path) if path else None), mode
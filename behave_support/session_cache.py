@@ -0,0 +1,99 @@
+"""
+Cache of logged-in browser sessions keyed by credentials.
+
+After the first successful login for an email/password pair, the session
+cookies and localStorage are stored here. Later logins with the same pair
+restore that state into the driver instead of submitting the form again.
+
+Entries expire after ``ttl`` seconds and should be dropped with
+``invalidate`` when a step logs out or deletes the account. With ``path`` set
+the cache is also kept on disk, so it survives across runs:
+
+    python -m behave -D session_cache=.sessions.json -D session_ttl=900
+    python -m behave -D session_cache=no          # always log in for real
+
+Only a hash of the credentials is stored, never the password itself.
+"""
+import hashlib
+import json
+import os
+import time
+
+COOKIE_FIELDS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry")
+
+READ_STORAGE = """
+var data = {};
+for (var i = 0; i < localStorage.length; i++) {
+    var key = localStorage.key(i);
+    data[key] = localStorage.getItem(key);
+}
+return data;
+"""
+
+WRITE_STORAGE = """
+localStorage.clear();
+var data = arguments[0];
+for (var key in data) { localStorage.setItem(key, data[key]); }
+"""
+
+
+def credentials_key(email, password):
+    return hashlib.sha256("{}\0{}".format(email, password).encode()).hexdigest()
+
+
+class SessionCache(object):
+
+    def __init__(self, path=None, ttl=1800):
+        self.path = path
+        self.ttl = ttl
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def _save(self):
+        if not self.path:
+            return
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.entries, f)
+        os.replace(self.path + ".tmp", self.path)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry and time.time() - entry["created"] > self.ttl:
+            self.invalidate(key)
+            return None
+        return entry
+
+    def put(self, key, driver):
+        cookies = [{k: c[k] for k in COOKIE_FIELDS if k in c} for c in driver.get_cookies()]
+        self.entries[key] = {
+            "created": time.time(),
+            "cookies": cookies,
+            "local_storage": driver.execute_script(READ_STORAGE),
+        }
+        self._save()
+
+    def invalidate(self, key):
+        if self.entries.pop(key, None) is not None:
+            self._save()
+
+    def restore(self, key, driver):
+        # Returns False on a miss; the driver must already be on the site.
+        entry = self.get(key)
+        if entry is None:
+            return False
+        driver.delete_all_cookies()
+        for cookie in entry["cookies"]:
+            driver.add_cookie(cookie)
+        driver.execute_script(WRITE_STORAGE, entry["local_storage"])
+        return True
+
+
+def from_userdata(userdata):
+    # -D session_cache=no disables the cache, any other value is a file path.
+    setting = userdata.get("session_cache", "memory")
+    if setting.lower() in ("no", "false", "off", "0"):
+        return None
+    path = None if setting == "memory" else os.path.abspath(setting)
+    return SessionCache(path=path, ttl=userdata.getint("session_ttl", 1800))
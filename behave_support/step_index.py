@@ -0,0 +1,135 @@
+"""
+Indexed step lookup for behave's step registry.
+
+behave finds the implementation of a step by trying every registered pattern
+in order until one matches, for every step of every scenario. ``install``
+replaces ``find_match`` on the registry with a lookup that
+
+* buckets the step definitions by the first (up to three) words of each
+  pattern's literal prefix, the text before its first placeholder or regex
+  construct, and only tries the definitions whose bucket and prefix fit the
+  step text, in their original registration order; and
+* remembers the result per step type and text, so a step repeated across
+  scenarios or Scenario Outline rows is matched once per run.
+
+Lookups return exactly what behave's own ``find_match`` would. The index is
+rebuilt whenever a step definition is added; call ``invalidate`` after
+changing the registry's lists directly. ``-D step_index=no`` turns it off.
+"""
+from behave import matchers
+
+PREFIX_WORDS = 3
+REGEX_SPECIAL = frozenset("\\.^$*+?()[]{}|")
+
+
+def _regex_prefix(pattern):
+    if "|" in pattern:
+        # An alternation may start anywhere; don't guess.
+        return ""
+    prefix = []
+    for char in pattern.lstrip("^"):
+        if char in REGEX_SPECIAL:
+            if char in "?*{" and prefix:
+                prefix.pop()  # the literal before an optional quantifier may be absent
+            break
+        prefix.append(char)
+    return "".join(prefix)
+
+
+def literal_prefix(matcher):
+    # Lowercased, since parse patterns match case-insensitively; the real
+    # matcher still decides, so a short prefix only costs a wasted try.
+    if isinstance(matcher, matchers.RegexMatcher):
+        return _regex_prefix(matcher.pattern).lower()
+    if isinstance(matcher, matchers.ParseMatcher):
+        return matcher.pattern.split("{", 1)[0].lower()
+    return ""
+
+
+def _key(text, complete_only):
+    words = text.split(" ")
+    if complete_only:
+        # The last word of a prefix may continue into the placeholder.
+        words = words[:-1]
+    return tuple(w for w in words if w)[:PREFIX_WORDS]
+
+
+class StepIndex(object):
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.buckets = None
+        # Candidates in registration order per step type and leading words.
+        self.merged = {}
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.buckets = None
+        self.merged.clear()
+        self.cache.clear()
+
+    def _build(self):
+        self.buckets = {}
+        for step_type, own in self.registry.steps.items():
+            candidates = list(own)
+            if step_type != "step":
+                candidates += self.registry.steps["step"]
+            buckets = self.buckets[step_type] = {}
+            for order, matcher in enumerate(candidates):
+                prefix = literal_prefix(matcher)
+                buckets.setdefault(_key(prefix, True), []).append((order, prefix, matcher))
+
+    def candidates(self, step_type, text):
+        if self.buckets is None:
+            self._build()
+        lowered = text.lower()
+        words = _key(lowered, False)
+        merged = self.merged.get((step_type, words))
+        if merged is None:
+            buckets = self.buckets[step_type]
+            merged = []
+            for size in range(len(words) + 1):
+                merged.extend(buckets.get(words[:size], ()))
+            merged.sort(key=lambda entry: entry[0])
+            self.merged[(step_type, words)] = merged
+        return [matcher for _, prefix, matcher in merged if lowered.startswith(prefix)]
+
+    def find_match(self, step):
+        key = (step.step_type, step.name)
+        if key in self.cache:
+            self.hits += 1
+            return self.cache[key]
+        self.misses += 1
+        result = None
+        for step_definition in self.candidates(step.step_type, step.name):
+            result = step_definition.match(step.name)
+            if result:
+                break
+        self.cache[key] = result or None
+        return self.cache[key]
+
+
+def install(registry):
+    # Idempotent: a registry that already has an index just gets it cleared.
+    index = getattr(registry, "step_index", None)
+    if index is not None:
+        index.clear()
+        return index
+    index = registry.step_index = StepIndex(registry)
+    add_step_definition = registry.add_step_definition
+
+    def add_and_invalidate(keyword, step_text, func):
+        add_step_definition(keyword, step_text, func)
+        index.clear()
+
+    registry.add_step_definition = add_and_invalidate
+    registry.find_match = index.find_match
+    return index
+
+
+def invalidate(registry):
+    index = getattr(registry, "step_index", None)
+    if index is not None:
+        index.clear()
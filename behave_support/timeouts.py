@@ -0,0 +1,89 @@
+"""
+Wait timeouts learned from how long the waits have taken before.
+
+Every ``waits.TimedWait`` is labelled with the step function that created it
+and its condition. The policy keeps the durations of the waits per label
+across runs and replaces the hard-coded timeout with the 95th percentile of
+that history times ``headroom``, never less than ``minimum`` seconds and
+never more than the timeout written in the step. A label with fewer than
+``min_samples`` recorded waits keeps the hard-coded timeout. A wait that
+times out is recorded at the time it waited, so when the site gets slower
+the learned timeouts grow with it instead of failing every run.
+
+On top of that every scenario has a time ``budget``: once it is spent, each
+further wait gets one last check and fails instead of waiting out its own
+timeout, so a broken run fails fast instead of timing out step after step.
+
+Both change when a scenario fails, so they are off unless asked for:
+
+    python -m behave -D adaptive_timeouts=yes          # history in .wait_history.json
+    python -m behave -D adaptive_timeouts=yes -D timeout_history=/tmp/waits.json -D scenario_budget=60
+"""
+import json
+import os
+import time
+from collections import defaultdict
+
+from behave_support import files
+from behave_support.profiler import percentile
+
+DEFAULT_HISTORY = ".wait_history.json"
+MAX_SAMPLES = 50
+# Pages of the live sites take seconds on a bad day; never expect less.
+MINIMUM = 5.0
+
+
+class TimeoutPolicy(object):
+
+    def __init__(self, path=None, headroom=1.5, minimum=MINIMUM, min_samples=5, budget=None):
+        self.path = path
+        self.headroom = headroom
+        self.minimum = minimum
+        self.min_samples = min_samples
+        self.budget = budget
+        self.samples = defaultdict(list)
+        self.new_samples = defaultdict(list)
+        self._deadline = None
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.samples.update(json.load(f))
+
+    def start_scenario(self):
+        self._deadline = time.time() + self.budget if self.budget else None
+
+    def timeout_for(self, label, default):
+        timeout = default
+        samples = self.samples.get(label, ())
+        if len(samples) >= self.min_samples:
+            timeout = min(default, max(self.minimum, percentile(samples, 95) * self.headroom))
+        if self._deadline is not None:
+            timeout = min(timeout, max(0.0, self._deadline - time.time()))
+        return timeout
+
+    def record(self, label, seconds, ok):
+        # A wait cut short by the spent budget says nothing about the page.
+        if not ok and self._deadline is not None and time.time() >= self._deadline:
+            return
+        for samples in (self.samples[label], self.new_samples[label]):
+            samples.append(round(seconds, 3))
+            del samples[:-MAX_SAMPLES]
+
+    def save(self):
+        if not self.path or not self.new_samples:
+            return
+        # Merge with what other workers wrote since this run loaded the file.
+        def merge(merged):
+            for label, samples in self.new_samples.items():
+                merged[label] = (merged.get(label, []) + samples)[-MAX_SAMPLES:]
+        files.update_json(self.path, merge)
+        self.new_samples.clear()
+
+
+def from_userdata(userdata):
+    if not userdata.getbool("adaptive_timeouts", False):
+        return None
+    budget = float(userdata.get("scenario_budget", 120)) or None
+    return TimeoutPolicy(path=os.path.abspath(userdata.get("timeout_history", DEFAULT_HISTORY)),
+                         headroom=float(userdata.get("timeout_headroom", 1.5)),
+                         minimum=float(userdata.get("timeout_minimum", MINIMUM)),
+                         budget=budget)
@@ -0,0 +1,116 @@
+"""
+A leaner HTTP transport for the WebDriver commands sent to chromedriver.
+
+Every ``find_element``, ``execute_script`` or ``.text`` is one HTTP request
+to chromedriver. selenium's own connection sends each of them through a
+``PoolManager``, which looks the pool up by URL, builds a new ``Retry`` for
+every request and recomputes the headers. ``PooledConnection`` keeps one
+``HTTPConnectionPool`` for chromedriver's address, with the headers computed
+once, no retries, and TCP keep-alive on the sockets, so all commands share a
+warm connection.
+
+It also times each request in two parts: ``last_wait``, from sending the
+request until chromedriver's response headers arrive (the browser's share),
+and ``last_receive``, reading the body. ``TransportTimer`` is a driver
+command listener that turns these into per-command browser time and
+transport overhead (everything else: JSON encoding, HTTP, decoding), and
+``calibrate`` measures the round trip of a no-op ``GET /status`` as the
+fixed cost of one call. With ``-D profile`` both go into ``profile.json``.
+
+    python -m behave -D pooled_transport=no     # selenium's own connection
+"""
+import functools
+import socket
+import time
+from collections import defaultdict
+from urllib import parse
+
+import urllib3
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+from urllib3.connection import HTTPConnection
+
+from behave_support.profiler import summarize
+
+SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+
+class PooledConnection(ChromeRemoteConnection):
+
+    def __init__(self, remote_server_addr, maxsize=2):
+        super(PooledConnection, self).__init__(remote_server_addr, keep_alive=True)
+        parsed_url = parse.urlparse(self._url)
+        self._headers = self.get_remote_connection_headers(parsed_url, keep_alive=True)
+        self._pool = urllib3.HTTPConnectionPool(
+            parsed_url.hostname, parsed_url.port, maxsize=maxsize, block=False, retries=False,
+            timeout=self._timeout, socket_options=SOCKET_OPTIONS)
+        # RemoteConnection._request sends keep-alive requests through _conn.
+        self._conn = self
+        self.last_wait = None
+        self.last_receive = None
+
+    def request(self, method, url, body=None, headers=None):
+        parts = parse.urlsplit(url)
+        target = parts.path + ("?" + parts.query if parts.query else "")
+        start = time.time()
+        response = self._pool.urlopen(method, target, body=body, headers=self._headers, retries=False,
+                                      preload_content=False, assert_same_host=False)
+        headers_at = time.time()
+        response.read(cache_content=True)
+        response.release_conn()
+        self.last_wait = headers_at - start
+        self.last_receive = time.time() - headers_at
+        return response
+
+    def calibrate(self, samples=5):
+        times = []
+        for _ in range(samples):
+            start = time.time()
+            self.request("GET", self._url + "/status")
+            times.append(time.time() - start)
+        return min(times)
+
+    def close(self):
+        self._pool.close()
+
+
+def install(driver, maxsize=2):
+    # Swaps the connection of a driver whose session is already open.
+    previous = driver.command_executor
+    driver.command_executor = PooledConnection(previous._url, maxsize=maxsize)
+    conn = getattr(previous, "_conn", None)
+    if conn is not None:
+        conn.clear()
+    return driver.command_executor
+
+
+class TransportTimer(object):
+    """Command listener splitting each command into browser and transport time."""
+
+    def __init__(self):
+        self.browser = defaultdict(list)
+        self.overhead = defaultdict(list)
+        self.status_rtt = []
+
+    def attach(self, driver):
+        connection = driver.command_executor
+        if isinstance(connection, PooledConnection):
+            self.status_rtt.append(connection.calibrate())
+            driver.command_listeners.append(functools.partial(self.record, connection))
+
+    def detach(self, driver):
+        driver.command_listeners[:] = [listener for listener in driver.command_listeners
+                                       if getattr(listener, "func", None) != self.record]
+
+    def record(self, connection, command, params, elapsed):
+        if connection.last_wait is None:
+            return
+        self.browser[command].append(connection.last_wait)
+        self.overhead[command].append(max(0.0, elapsed - connection.last_wait))
+
+    def report(self):
+        return {
+            "status_rtt": round(min(self.status_rtt), 6) if self.status_rtt else None,
+            "commands": {command: {"browser": summarize(self.browser[command]),
+                                   "transport": summarize(self.overhead[command])}
+                         for command in sorted(self.browser)},
+        }
@@ -0,0 +1,98 @@
+"""
+Virtual clock for pages that are driven by JavaScript timers.
+
+Scenarios tagged ``@virtual_time`` get fake ``setTimeout``/``setInterval``
+and ``Date`` in every page the driver loads. ``driver.pause(ms)`` (the
+built-in "I pause for {ms}ms" step) then advances that clock instead of
+sleeping, so a 5 second redirect fires immediately and a 4.5 second pause
+still does not reach it.
+
+Run with ``-D virtual_time=no`` to fall back to real sleeps.
+"""
+
+FAKE_TIMERS = """
+(function () {
+    if (window.__virtualClock) { return; }
+    var RealDate = Date;
+    var start = RealDate.now(), elapsed = 0, nextId = 1, timers = {};
+
+    function now() { return start + elapsed; }
+
+    function schedule(fn, delay, args, repeat) {
+        var id = nextId++;
+        delay = Math.max(0, Number(delay) || 0);
+        timers[id] = {fn: fn, args: args, at: elapsed + delay, every: repeat ? Math.max(1, delay) : 0};
+        return id;
+    }
+
+    function run(timer) {
+        if (typeof timer.fn === 'function') {
+            timer.fn.apply(window, timer.args);
+        } else {
+            (0, eval)(String(timer.fn));
+        }
+    }
+
+    window.setTimeout = function (fn, delay) {
+        return schedule(fn, delay, Array.prototype.slice.call(arguments, 2), false);
+    };
+    window.setInterval = function (fn, delay) {
+        return schedule(fn, delay, Array.prototype.slice.call(arguments, 2), true);
+    };
+    window.clearTimeout = window.clearInterval = function (id) { delete timers[id]; };
+
+    function FakeDate() {
+        if (!(this instanceof FakeDate)) { return new RealDate(now()).toString(); }
+        var args = Array.prototype.slice.call(arguments);
+        if (!args.length) { args = [now()]; }
+        return new (Function.prototype.bind.apply(RealDate, [null].concat(args)))();
+    }
+    FakeDate.prototype = RealDate.prototype;
+    FakeDate.now = now;
+    FakeDate.parse = RealDate.parse;
+    FakeDate.UTC = RealDate.UTC;
+    window.Date = FakeDate;
+
+    window.__virtualClock = {
+        now: now,
+        tick: function (ms) {
+            var target = elapsed + ms, fired = 0;
+            while (true) {
+                var due = null;
+                for (var id in timers) {
+                    if (timers[id].at <= target && (due === null || timers[id].at < timers[due].at)) { due = id; }
+                }
+                if (due === null) { break; }
+                var timer = timers[due];
+                elapsed = Math.max(elapsed, timer.at);
+                if (timer.every) { timer.at += timer.every; } else { delete timers[due]; }
+                run(timer);
+                fired++;
+            }
+            elapsed = target;
+            return fired;
+        }
+    };
+})();
+"""
+
+TICK = "return window.__virtualClock ? window.__virtualClock.tick(arguments[0]) : null;"
+
+
+def install(driver):
+    # Future documents get the clock from Chrome, the current one right away.
+    result = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": FAKE_TIMERS})
+    driver.execute_script(FAKE_TIMERS)
+    driver.virtual_clock = result["identifier"]
+
+
+def uninstall(driver):
+    if getattr(driver, "virtual_clock", None) is None:
+        return
+    driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": driver.virtual_clock})
+    driver.virtual_clock = None
+
+
+def tick(driver, milliseconds):
+    # Returns the number of timers fired, or None if the page has no clock.
+    return driver.execute_script(TICK, milliseconds)
@@ -0,0 +1,98 @@
+"""
+Event-driven waits for the step files.
+
+``TimedWait`` is a drop-in ``WebDriverWait`` that polls quickly and records
+how long every wait really took, so a step returns as soon as the page is
+ready instead of after a fixed ``time.sleep``. The conditions below cover the
+cases the ecommerce steps used to sleep for.
+
+Run with ``-D wait_report=yes`` to print the recorded waits after every
+scenario. When ``policy`` is set (see timeouts.py) the timeout of every wait
+comes from it rather than from the step.
+"""
+import sys
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+# (label, seconds, succeeded) for every TimedWait.until() since the last reset.
+history = []
+# A timeouts.TimeoutPolicy, installed by the hooks.
+policy = None
+
+
+class element_count_changed(object):
+    """The number of elements matching ``locator`` differs from ``previous``."""
+
+    def __init__(self, locator, previous):
+        self.locator = locator
+        self.previous = previous
+
+    def __call__(self, driver):
+        count = len(driver.find_elements(*self.locator))
+        return count if count != self.previous else False
+
+
+def modal_shown(css):
+    """A modal matching ``css`` is visible; returns the element."""
+    return EC.visibility_of_element_located(("css selector", css))
+
+
+def describe(condition):
+    name = getattr(condition, "__name__", None) or type(condition).__name__
+    locator = getattr(condition, "locator", None)
+    if locator:
+        name += "({})".format(locator[1])
+    return name
+
+
+class TimedWait(WebDriverWait):
+    """WebDriverWait that polls every 50 ms and logs its duration."""
+
+    def __init__(self, driver, timeout, poll_frequency=0.05, ignored_exceptions=None, label=None):
+        super(TimedWait, self).__init__(driver, timeout, poll_frequency, ignored_exceptions)
+        # Default to the name of the step function that created the wait.
+        self.label = label or sys._getframe(1).f_code.co_name
+
+    def until(self, method, message=""):
+        return self._timed(super(TimedWait, self).until, method, message)
+
+    def until_not(self, method, message=""):
+        return self._timed(super(TimedWait, self).until_not, method, message)
+
+    def _timed(self, wait, method, message):
+        label = "{}: {}".format(self.label, describe(method))
+        default = self._timeout
+        if policy is not None:
+            self._timeout = policy.timeout_for(label, default)
+        start = time.time()
+        try:
+            result = wait(method, message)
+        except TimeoutException as e:
+            self._finish(label, time.time() - start, False)
+            if self._timeout < default:
+                raise TimeoutException("{} (adaptive timeout {:.1f}s, the step allows {}s)".format(
+                    e.msg or label, self._timeout, default), e.screen, e.stacktrace)
+            raise
+        finally:
+            self._timeout = default
+        self._finish(label, time.time() - start, True)
+        return result
+
+    def _finish(self, label, seconds, ok):
+        history.append((label, seconds, ok))
+        if policy is not None:
+            policy.record(label, seconds, ok)
+
+
+def wait_for(driver, condition, timeout=10, label=None):
+    return TimedWait(driver, timeout, label=label or sys._getframe(1).f_code.co_name).until(condition)
+
+
+def report():
+    lines = []
+    for label, seconds, ok in history:
+        lines.append("[WAIT] {:>6.2f}s {}{}".format(seconds, label, "" if ok else " (timed out)"))
+    return "\n".join(lines)
@@ -0,0 +1 @@
+# Lets pytest import behave_support from the repository root.
@@ -6,11 +6,13 @@ Feature: E-Commerce Shop Operations
   Background:
     Given I navigate to the Automation Exercise homepage
 
+  @load_catalog
   Scenario: View all products
     When I navigate to the Products page
     Then I should see the list of all products
     And I should see the "ALL PRODUCTS" header
 
+  @load_catalog
   Scenario: Search for a specific product
     When I navigate to the Products page
     And I search for the product "T-Shirt"
@@ -30,6 +32,8 @@ Feature: E-Commerce Shop Operations
     And I click Continue Shopping button
     And I navigate to the Cart page
     Then I should see 1 item in the cart
+    And the page should load within 8000 ms
+    And the largest contentful paint should be under 4000 ms
 
   Scenario: Remove item from cart
     Given the cart is empty
@@ -38,11 +42,13 @@ Feature: E-Commerce Shop Operations
     And I click the "X" button to remove the item
     Then I should see that the cart is empty
 
+  @load_catalog
   Scenario: View Category Products
     When I click on the "Women" category
     And I click on the "Dress" sub-category
     Then I should see "WOMEN - DRESS PRODUCTS" in the page header
 
+  @load_catalog
   Scenario: View Brand Products
     When I navigate to the Products page
     And I click on the "Polo" brand in the sidebar
@@ -92,6 +98,8 @@ Feature: E-Commerce Shop Operations
     And I click Proceed to Checkout
     Then I should see the checkout modal requesting login
 
+  # Logs in through the form so the anonymous cart carries over to the account
+  @ui_setup
   Scenario: Search Products and Verify Cart After Login
     Given the cart is empty
     When I navigate to the Products page
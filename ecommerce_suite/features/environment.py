@@ -1,10 +1,48 @@
-import behave_webdriver
+import os
+import sys
+
+# Make the shared behave_support package at the repository root importable.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
 from behave_webdriver.steps import *
+from behave_support.perf_steps import *
+from behave_support import hooks
+from behave_support.load_profiles import LoadProfile
+
+# Catalogue scenarios only read product names and headers: skip the product
+# images and wait for the listing header instead of the load event.
+LOAD_PROFILES = {
+    "catalog": LoadProfile(suppress=("images", "media", "fonts"), ready=".features_items h2.title"),
+}
 
 def before_all(context):
 
-    context.behave_driver = behave_webdriver.Chrome.headless()
+    hooks.before_all(context, load_profiles=LOAD_PROFILES)
+
+def before_feature(context, feature):
+
+    hooks.before_feature(context, feature)
+
+def before_scenario(context, scenario):
+
+    hooks.before_scenario(context, scenario)
+
+def before_step(context, step):
+
+    hooks.before_step(context, step)
+
+def after_step(context, step):
+
+    hooks.after_step(context, step)
+
+def after_scenario(context, scenario):
+
+    hooks.after_scenario(context, scenario)
+
+def after_feature(context, feature):
+
+    hooks.after_feature(context, feature)
 
 def after_all(context):
 
-    context.behave_driver.quit()
\ No newline at end of file
+    hooks.after_all(context)
@@ -0,0 +1,207 @@
+"""
+Page objects for the Automation Exercise pages the ecommerce steps drive.
+
+Locators are declared once per page as ``Locator`` attributes. Reading a
+single-element locator resolves it with ``find_element`` the first time and
+returns the cached handle after that, until the page changes: the cache is
+dropped when ``driver.page_version`` moves on (a page load, or a click that
+may have caused one) and per element when it turns out to be stale, in which
+case the lookup is retried. ``many=True`` locators are looked up on every
+read, since lists change without the page changing (a cart row is removed).
+
+Locators declared with ``scroll=True`` are scrolled into view before they
+are clicked; the others are clicked straight away.
+
+Use the page methods (``click``, ``type``, ``text``, ``with_elements``) rather
+than holding on to raw elements, so stale handles are re-resolved for you.
+Waits can reuse the same locators through ``Page.locator_name.locator``.
+"""
+from selenium.common.exceptions import ElementClickInterceptedException, StaleElementReferenceException
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.by import By
+
+BASE_URL = "https://automationexercise.com"
+
+
+class Locator(object):
+
+    def __init__(self, by, value, many=False, scroll=False):
+        self.by = by
+        self.value = value
+        self.many = many
+        self.scroll = scroll
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    @property
+    def locator(self):
+        return (self.by, self.value)
+
+    def __get__(self, page, owner=None):
+        if page is None:
+            return self
+        return page.resolve(self)
+
+
+class Page(object):
+    path = "/"
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._cache = {}
+        self._version = None
+
+    def open(self):
+        self.driver.get(BASE_URL + self.path)
+        return self
+
+    def resolve(self, locator):
+        if locator.many:
+            return self.driver.find_elements(*locator.locator)
+        version = getattr(self.driver, "page_version", None)
+        if version != self._version:
+            self._cache.clear()
+            self._version = version
+        if locator.name not in self._cache:
+            self._cache[locator.name] = self.driver.find_element(*locator.locator)
+        return self._cache[locator.name]
+
+    def forget(self, *names):
+        for name in names or list(self._cache):
+            self._cache.pop(name, None)
+
+    def with_elements(self, action, *names, attempts=3):
+        # Calls action(*elements), re-resolving them if any has gone stale.
+        for attempt in range(attempts):
+            try:
+                return action(*[getattr(self, name) for name in names])
+            except StaleElementReferenceException:
+                if attempt == attempts - 1:
+                    raise
+                self.forget(*names)
+
+    def click(self, name):
+        scroll = getattr(type(self), name).scroll
+
+        def _click(elem):
+            if scroll:
+                self.driver.execute_script("arguments[0].scrollIntoView();", elem)
+            try:
+                elem.click()
+            except ElementClickInterceptedException as e:
+                print(f"[WARN] Click intercepted: {e}. Trying JS click.")
+                self.driver.execute_script("arguments[0].click();", elem)
+        self.with_elements(_click, name)
+
+    def type(self, name, text, clear=False):
+        def _type(elem):
+            if clear:
+                elem.clear()
+            elem.send_keys(text)
+        self.with_elements(_type, name)
+
+    def text(self, name):
+        return self.with_elements(lambda elem: elem.text, name)
+
+
+class ShopPage(Page):
+    # Header, footer and modals shared by every page of the shop
+    login_link = Locator(By.CSS_SELECTOR, "a[href='/login']", scroll=True)
+    products_link = Locator(By.CSS_SELECTOR, "a[href='/products']")
+    cart_link = Locator(By.CSS_SELECTOR, "a[href='/view_cart']", scroll=True)
+    contact_link = Locator(By.CSS_SELECTOR, "a[href='/contact_us']")
+    test_cases_link = Locator(By.CSS_SELECTOR, "a[href='/test_cases']")
+    logout_link = Locator(By.CSS_SELECTOR, "a[href='/logout']")
+    delete_account_link = Locator(By.CSS_SELECTOR, "a[href='/delete_account']")
+    logged_in_as = Locator(By.XPATH, "//*[contains(text(), 'Logged in as')]")
+    title_header = Locator(By.CSS_SELECTOR, "h2.title.text-center")
+    subscribe_email = Locator(By.ID, "susbscribe_email")
+    subscribe_button = Locator(By.ID, "subscribe")
+    subscribe_success = Locator(By.ID, "success-subscribe")
+    scroll_up_arrow = Locator(By.ID, "scrollUp", scroll=True)
+    cart_modal = Locator(By.CSS_SELECTOR, "#cartModal, .modal-content")
+    continue_shopping = Locator(By.CSS_SELECTOR, "button.close-modal")
+
+
+class HomePage(ShopPage):
+    path = "/"
+    logo = Locator(By.XPATH, "//img[@alt='Website for automation practice']")
+    slider_text = Locator(By.CSS_SELECTOR, ".carousel-inner .item.active h2")
+    recommended_items = Locator(By.CLASS_NAME, "recommended_items")
+    recommended_add_buttons = Locator(
+        By.CSS_SELECTOR, ".recommended_items .carousel-inner .item.active a[data-product-id].add-to-cart", many=True)
+
+
+class ProductsPage(ShopPage):
+    path = "/products"
+    features_items = Locator(By.CLASS_NAME, "features_items", many=True)
+    product_cards = Locator(By.CLASS_NAME, "single-products", many=True)
+    search_input = Locator(By.ID, "search_product")
+    search_button = Locator(By.ID, "submit_search")
+    first_view_product = Locator(By.CSS_SELECTOR, ".choose a")
+
+    def add_first_product_to_cart(self):
+        def _add(cards):
+            product = cards[0]
+            self.driver.execute_script("arguments[0].scrollIntoView();", product)
+            ActionChains(self.driver).move_to_element(product).perform()
+            add_btn = product.find_element(By.CSS_SELECTOR, ".product-overlay a.add-to-cart")
+            self.driver.execute_script("arguments[0].click();", add_btn)
+        self.with_elements(_add, "product_cards")
+
+
+class CartPage(ShopPage):
+    path = "/view_cart"
+    rows = Locator(By.CSS_SELECTOR, "tbody tr[id^='product-']", many=True)
+    first_row = Locator(By.CSS_SELECTOR, "tbody tr[id^='product-']")
+    delete_button = Locator(By.CLASS_NAME, "cart_quantity_delete")
+    checkout_button = Locator(By.CSS_SELECTOR, ".btn.check_out")
+    checkout_modal = Locator(By.ID, "checkoutModal")
+    empty_cart = Locator(By.ID, "empty_cart")
+
+    def first_row_quantity(self):
+        return self.with_elements(
+            lambda row: row.find_element(By.CSS_SELECTOR, ".cart_quantity button").text.strip(), "first_row")
+
+
+class LoginPage(ShopPage):
+    path = "/login"
+    login_email = Locator(By.CSS_SELECTOR, "input[data-qa='login-email']")
+    login_password = Locator(By.CSS_SELECTOR, "input[data-qa='login-password']")
+    login_button = Locator(By.CSS_SELECTOR, "button[data-qa='login-button']")
+    login_error = Locator(By.CSS_SELECTOR, "form[action='/login'] p")
+    signup_name = Locator(By.CSS_SELECTOR, "input[data-qa='signup-name']")
+    signup_email = Locator(By.CSS_SELECTOR, "input[data-qa='signup-email']")
+    signup_button = Locator(By.CSS_SELECTOR, "button[data-qa='signup-button']")
+
+
+class ProductDetailPage(ShopPage):
+    path = "/product_details/1"
+    quantity = Locator(By.ID, "quantity")
+    add_to_cart = Locator(By.CSS_SELECTOR, "button.add-to-cart, .product-information button", scroll=True)
+    review_name = Locator(By.ID, "name")
+    review_email = Locator(By.ID, "email")
+    review_text = Locator(By.ID, "review")
+    review_button = Locator(By.ID, "button-review")
+    review_success = Locator(By.CSS_SELECTOR, ".alert-success span")
+
+
+class Pages(object):
+
+    def __init__(self, driver):
+        self.shop = ShopPage(driver)
+        self.home = HomePage(driver)
+        self.products = ProductsPage(driver)
+        self.cart = CartPage(driver)
+        self.login = LoginPage(driver)
+        self.product_detail = ProductDetailPage(driver)
+
+
+def for_driver(driver):
+    # One set of page objects (and element caches) per browser.
+    pages = getattr(driver, "shop_pages", None)
+    if pages is None:
+        pages = driver.shop_pages = Pages(driver)
+    return pages
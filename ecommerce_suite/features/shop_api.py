@@ -0,0 +1,108 @@
+"""
+Direct HTTP access to the Automation Exercise cart and login endpoints.
+
+Used by precondition steps to set up the cart or a logged-in session without
+driving the UI. Scenarios that are testing those UI flows themselves can opt
+out with the ``@ui_setup`` tag, and ``-D http_fixtures=no`` turns the HTTP
+path off for the whole run.
+"""
+import re
+from urllib.parse import urlsplit
+
+from behave_support.http_session import HttpSession
+from behave_support.session_cache import credentials_key
+from pages import BASE_URL, ShopPage
+
+CART_ROW = re.compile(r'<tr id="product-(\d+)"')
+CSRF_TOKEN = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def use_http_fixtures(context):
+    if "ui_setup" in context.scenario.effective_tags:
+        return False
+    return context.config.userdata.getbool("http_fixtures", True)
+
+
+def _on_site(driver):
+    # Cookies can only be shared once the browser is on the shop's domain.
+    if urlsplit(driver.current_url).hostname != urlsplit(driver.rewrite_url(BASE_URL)).hostname:
+        driver.get(BASE_URL + "/")
+
+
+def _session(context):
+    _on_site(context.behave_driver)
+    return HttpSession.for_context(context)
+
+
+def cart_product_ids(session):
+    return CART_ROW.findall(session.get(BASE_URL + "/view_cart").text)
+
+
+def empty_cart(context):
+    session = _session(context)
+    for product_id in cart_product_ids(session):
+        session.get(BASE_URL + "/delete_cart/{}".format(product_id))
+    session.cookies_to_driver(context.behave_driver)
+
+
+def add_to_cart(context, product_id=1, quantity=1):
+    session = _session(context)
+    for _ in range(quantity):
+        response = session.get(BASE_URL + "/add_to_cart/{}".format(product_id))
+        assert response.status == 200, "add_to_cart/{} returned {}".format(product_id, response.status)
+    session.cookies_to_driver(context.behave_driver)
+
+
+def login(context, email, password):
+    session = _session(context)
+    match = CSRF_TOKEN.search(session.get(BASE_URL + "/login").text)
+    assert match, "No CSRF token on the login page."
+    response = session.post(BASE_URL + "/login", {
+        "csrfmiddlewaretoken": match.group(1),
+        "email": email,
+        "password": password,
+    }, headers={"Referer": BASE_URL + "/login"}, follow_redirects=False)
+    # A successful login redirects; a failed one re-renders the form.
+    assert 300 <= response.status < 400, "Login failed for {}".format(email)
+    session.cookies_to_driver(context.behave_driver)
+    context.behave_driver.refresh()
+
+
+# --- Logged-in session cache (see behave_support.session_cache) ---
+
+def _cache(context):
+    if "ui_setup" in context.scenario.effective_tags:
+        return None
+    return getattr(context, "session_cache", None)
+
+
+def restore_login(context, email, password):
+    cache = _cache(context)
+    if cache is None:
+        return False
+    key = credentials_key(email, password)
+    if cache.get(key) is None:
+        return False
+    _on_site(context.behave_driver)
+    cache.restore(key, context.behave_driver)
+    context.behave_driver.get(BASE_URL + "/")
+    context.logged_in_as = key
+    return True
+
+
+def remember_login(context, email, password):
+    cache = _cache(context)
+    driver = context.behave_driver
+    if cache is None or not driver.find_elements(*ShopPage.logged_in_as.locator):
+        return
+    key = credentials_key(email, password)
+    cache.put(key, driver)
+    context.logged_in_as = key
+
+
+def forget_login(context):
+    cache = getattr(context, "session_cache", None)
+    key = getattr(context, "logged_in_as", None)
+    if cache is not None and key:
+        cache.invalidate(key)
+    context.logged_in_as = None
@@ -1,3 +1,4 @@
+@http_backend
 Feature: Find out if it's Christmas or not
   As a person of celebration
   I want to know if it's Christmas
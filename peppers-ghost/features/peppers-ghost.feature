@@ -1,3 +1,4 @@
+@http_backend
 Feature: Peppers Ghost DIY Project with custom steps
     As a person who likes Halloween
     I want to ensure my peppers ghost diy site has pictures on it
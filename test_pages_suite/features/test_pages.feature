@@ -1,3 +1,4 @@
+@shared_state @load_eager
 Feature:
     As a poor helpless student trying to learn how to use behave
     I want to use an easy but relevant sample page as practice for using the builtin steps
@@ -31,6 +32,7 @@ Feature:
         Then I expect that element "#message" is not visible
 
     #6
+    @virtual_time
     Scenario: I submit and can see submission message
         When I move to element "#submitBtn"
         And I click on the element "#submitBtn"
@@ -53,6 +55,7 @@ Feature:
         Then I expect that element ".explanation > *" contains the text "You submitted the form."
 
     #8
+    @virtual_time
     Scenario: I am not redirected in 4.5 seconds
         Given I open the url "https://testpages.herokuapp.com/pages/navigation/javascript-redirects/"
         When I move to element "#delaygotobasic"
@@ -61,6 +64,7 @@ Feature:
         Then I expect the url to not contain "redirected"
 
     #9
+    @virtual_time
     Scenario: I am redirected in 5.5 seconds
         Given I open the url "https://testpages.herokuapp.com/pages/navigation/javascript-redirects/"
         When I move to element "#delaygotobasic"
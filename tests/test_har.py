@@ -0,0 +1,77 @@
+import json
+
+from behave_support.har import Scenario
+
+
+def _entry(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+def _request(request_id, url, timestamp, type_="Script", **extra):
+    return _entry("Network.requestWillBeSent", requestId=request_id, type=type_, timestamp=timestamp,
+                  wallTime=1700000000 + timestamp, request={"url": url, "method": "GET", "headers": {}}, **extra)
+
+
+def _finished(request_id, timestamp, size):
+    return _entry("Network.loadingFinished", requestId=request_id, timestamp=timestamp, encodedDataLength=size)
+
+
+def _response(request_id, status=200):
+    return _entry("Network.responseReceived", requestId=request_id,
+                  response={"status": status, "statusText": "OK", "headers": {}, "mimeType": "text/html",
+                            "protocol": "h2"})
+
+
+def test_events_fold_into_per_step_summaries():
+    scenario = Scenario("shop")
+    scenario.add(0, [
+        _request("1", "https://www.shop.com/products", 10.0, type_="Document"),
+        _response("1"),
+        _entry("Network.dataReceived", requestId="1", encodedDataLength=100),
+        _finished("1", 10.3, 5000),
+        _request("2", "https://cdn.ads.net/ad.js", 10.1),
+        _finished("2", 10.2, 700),
+        _entry("Page.frameNavigated", frame={}),
+    ])
+    scenario.add(1, [
+        _request("3", "https://static.shop.com/app.js", 11.0),
+        _entry("Network.loadingFailed", requestId="3", timestamp=11.05, errorText="net::ERR_FAILED"),
+    ])
+    summaries = scenario.summaries()
+    first = summaries[0]
+    assert (first["requests"], first["failed"], first["bytes"]) == (2, 0, 5700)
+    # 100 ms of the step's 400 ms went to a host outside shop.com.
+    assert first["third_party_time_share"] == 0.25
+    assert [s["url"] for s in first["slowest"]] == ["https://www.shop.com/products", "https://cdn.ads.net/ad.js"]
+    assert summaries[1]["failed"] == 1
+    assert summaries[1]["third_party_time_share"] == 0.0
+
+
+def test_redirects_end_the_first_hop():
+    scenario = Scenario("shop")
+    scenario.add(0, [
+        _request("1", "http://shop.com/", 1.0, type_="Document"),
+        _request("1", "https://shop.com/", 1.2, type_="Document",
+                 redirectResponse={"status": 301, "headers": {"location": "https://shop.com/"}}),
+        _finished("1", 1.5, 300),
+    ])
+    entries = scenario.har()["log"]["entries"]
+    assert [(e["request"]["url"], e["response"]["status"]) for e in entries] == [
+        ("http://shop.com/", 301), ("https://shop.com/", 0)]
+    assert entries[0]["response"]["redirectURL"] == "https://shop.com/"
+    assert entries[0]["time"] == 200.0
+
+
+def test_unfinished_requests_are_still_reported():
+    scenario = Scenario("shop")
+    scenario.add(0, [_request("1", "https://shop.com/poll", 1.0), _response("1")])
+    entry = scenario.har()["log"]["entries"][0]
+    assert entry["time"] == 0.0
+    assert entry["request"]["httpVersion"] == "HTTP/2"
+    assert scenario.summaries()[0]["requests"] == 1
+
+
+def test_events_of_unknown_requests_are_ignored():
+    scenario = Scenario("shop")
+    scenario.add(0, [_response("missing"), _finished("missing", 1.0, 10)])
+    assert scenario.requests() == []
@@ -0,0 +1,87 @@
+import pytest
+from selenium.common.exceptions import InvalidSelectorException, NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from behave_support.http_driver import parse_html
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>Shop</title><script>var hidden = 1;</script></head>
+<body>
+  <div id="main" class="features_items wide">
+    <h2 class="title text-center">All   Products</h2>
+    <ul class="nav">
+      <li><a href="/products" data-qa="products-link">Products</a>
+      <li><a href="/view_cart">Cart</a>
+    </ul>
+    <p>First paragraph
+    <p>Second <b>bold</b> paragraph
+    <form action="/search">
+      <input id="search_product" name="search" value="shirt">
+      <input type="hidden" name="csrf" value="x">
+      <input disabled name="off">
+      <textarea name="review">Great product</textarea>
+    </form>
+    <div style="display: none"><span class="secret">gone</span></div>
+  </div>
+</body></html>"""
+
+
+@pytest.fixture
+def page():
+    return parse_html(PAGE)
+
+
+def texts(elements):
+    return [element.text for element in elements]
+
+
+def test_simple_selectors(page):
+    assert page.find_element(By.CSS_SELECTOR, "#main").tag_name == "div"
+    assert texts(page.find_elements(By.CSS_SELECTOR, "h2.title.text-center")) == ["All Products"]
+    assert texts(page.find_elements(By.CSS_SELECTOR, "a[href='/view_cart']")) == ["Cart"]
+    assert texts(page.find_elements(By.CSS_SELECTOR, "a[href^='/view']")) == ["Cart"]
+    assert texts(page.find_elements(By.CSS_SELECTOR, "a[data-qa]")) == ["Products"]
+    assert texts(page.find_elements(By.CSS_SELECTOR, "[class~=wide] > h2")) == ["All Products"]
+
+
+def test_combinators_and_groups(page):
+    assert len(page.find_elements(By.CSS_SELECTOR, "div ul a")) == 2
+    assert page.find_elements(By.CSS_SELECTOR, "body > a") == []
+    assert texts(page.find_elements(By.CSS_SELECTOR, "title, h2")) == ["Shop", "All Products"]
+
+
+def test_unsupported_selectors_are_rejected(page):
+    with pytest.raises(InvalidSelectorException):
+        page.find_elements(By.CSS_SELECTOR, "li:first-child")
+    with pytest.raises(InvalidSelectorException):
+        page.find_elements(By.XPATH, "//li")
+
+
+def test_other_locators(page):
+    assert page.find_element(By.ID, "search_product").get_attribute("name") == "search"
+    assert page.find_element(By.NAME, "search").get_property("value") == "shirt"
+    assert len(page.find_elements(By.CLASS_NAME, "features_items")) == 1
+    assert page.find_element(By.LINK_TEXT, "Cart").get_attribute("href") == "/view_cart"
+    assert page.find_element(By.PARTIAL_LINK_TEXT, "Prod").get_attribute("href") == "/products"
+    with pytest.raises(NoSuchElementException):
+        page.find_element(By.ID, "missing")
+
+
+def test_implied_end_tags(page):
+    # The unclosed <li> and <p> elements end at their next sibling.
+    assert texts(page.find_elements(By.CSS_SELECTOR, "ul > li")) == ["Products", "Cart"]
+    assert texts(page.find_elements(By.TAG_NAME, "p")) == ["First paragraph", "Second bold paragraph"]
+
+
+def test_text_collapses_whitespace_and_skips_hidden_elements(page):
+    text = page.find_element(By.TAG_NAME, "body").text
+    assert "All Products\nProducts\nCart\nFirst paragraph" in text
+    assert "hidden" not in text
+
+
+def test_form_values_and_visibility(page):
+    assert page.find_element(By.NAME, "review").get_property("value") == "Great product"
+    assert page.find_element(By.NAME, "off").get_attribute("disabled") == "true"
+    assert not page.find_element(By.NAME, "csrf").is_displayed()
+    assert not page.find_element(By.CLASS_NAME, "secret").is_displayed()
+    assert page.find_element(By.ID, "search_product").is_displayed()
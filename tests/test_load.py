@@ -0,0 +1,27 @@
+import json
+
+from behave_support import load
+
+
+def _run(tmp_path, name, duration, returncode=0, **extra):
+    report = tmp_path / (name + ".json")
+    step = {"keyword": "Given", "name": "I open the shop",
+            "result": {"status": "passed" if returncode == 0 else "failed", "duration": duration}}
+    report.write_text(json.dumps([{"elements": [{"steps": [step]}]}]))
+    return dict({"report": str(report), "returncode": returncode}, **extra)
+
+
+def test_aggregate_reports_queueing_apart_from_step_latency(tmp_path):
+    runs = [_run(tmp_path, "a", 0.2, queued=3.0), _run(tmp_path, "b", 0.4, queued=5.0), _run(tmp_path, "c", 0.3)]
+    report = load.aggregate(runs, 10.0)
+    assert report["queueing"]["count"] == 2
+    assert report["queueing"]["p99"] >= 4.9
+    assert report["steps"]["Given I open the shop"]["p99"] <= 0.4
+    assert "(waiting for a browser)" in load.format_report(report)
+
+
+def test_aggregate_counts_worker_deaths_as_crashes(tmp_path):
+    runs = [_run(tmp_path, "a", 0.2), _run(tmp_path, "b", 0.2, returncode=1), _run(tmp_path, "c", 0.2, returncode=-1)]
+    scenarios = load.aggregate(runs, 1.0)["scenarios"]
+    assert (scenarios["runs"], scenarios["errors"], scenarios["crashes"]) == (3, 2, 1)
+    assert "queueing" not in load.aggregate(runs, 1.0)
@@ -0,0 +1,52 @@
+import json
+
+from behave_support import parallel
+
+
+def test_shard_deals_units_round_robin():
+    units = [["a.feature:3"], ["a.feature:7"], ["b.feature"], ["c.feature:2"]]
+    assert parallel.shard(units, 2) == [["a.feature:3", "b.feature"], ["a.feature:7", "c.feature:2"]]
+
+
+def test_shard_never_makes_empty_shards():
+    assert parallel.shard([["a.feature:3"], ["a.feature:7"]], 8) == [["a.feature:3"], ["a.feature:7"]]
+    assert parallel.shard([], 4) == [[]]
+
+
+def test_collect_units_keeps_shared_state_features_whole(tmp_path):
+    features = tmp_path / "features"
+    features.mkdir()
+    (features / "a.feature").write_text(
+        "Feature: A\n\n  Scenario: one\n    Given x\n\n  Scenario: two\n    Given y\n")
+    (features / "b.feature").write_text(
+        "@shared_state\nFeature: B\n\n  Scenario: one\n    Given x\n\n  Scenario: two\n    Given y\n")
+    assert parallel.collect_units(str(tmp_path)) == [
+        ["features/a.feature:3"], ["features/a.feature:6"], ["features/b.feature"]]
+
+
+def _element(line, status="passed", type_="scenario"):
+    return {"type": type_, "location": "features/a.feature:{}".format(line), "status": status, "steps": []}
+
+
+def _write(path, elements, status="passed"):
+    path.write_text(json.dumps([{"location": "features/a.feature:1", "name": "A", "status": status,
+                                 "elements": elements}]))
+    return str(path)
+
+
+def test_merge_reports_orders_scenarios_and_drops_repeated_backgrounds(tmp_path):
+    first = _write(tmp_path / "worker-0.json", [_element(3, type_="background"), _element(12)])
+    second = _write(tmp_path / "worker-1.json", [_element(3, type_="background"), _element(6, "failed")],
+                    status="failed")
+    merged = parallel.merge_reports([first, second])
+    assert len(merged) == 1
+    assert [e["location"] for e in merged[0]["elements"]] == [
+        "features/a.feature:3", "features/a.feature:6", "features/a.feature:12"]
+    assert merged[0]["status"] == "failed"
+
+
+def test_merge_reports_skips_missing_and_empty_reports(tmp_path):
+    (tmp_path / "empty.json").write_text("")
+    report = _write(tmp_path / "worker-0.json", [_element(6)])
+    merged = parallel.merge_reports([str(tmp_path / "missing.json"), str(tmp_path / "empty.json"), report])
+    assert [e["location"] for e in merged[0]["elements"]] == ["features/a.feature:6"]
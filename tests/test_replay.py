@@ -0,0 +1,67 @@
+from behave_support.replay import FixtureStore
+
+
+def test_key_is_method_and_url_without_a_body():
+    assert FixtureStore.key("GET", "http://shop/products") == "GET http://shop/products"
+
+
+def test_key_tells_request_bodies_apart():
+    first = FixtureStore.key("POST", "http://shop/search", b"q=shirt")
+    assert first.startswith("POST http://shop/search ")
+    assert first == FixtureStore.key("POST", "http://shop/search", b"q=shirt")
+    assert first != FixtureStore.key("POST", "http://shop/search", b"q=jeans")
+
+
+def test_key_leaves_out_csrf_tokens():
+    first = FixtureStore.key("POST", "http://shop/login", b"csrfmiddlewaretoken=abc&email=a%40b.c")
+    assert first == FixtureStore.key("POST", "http://shop/login", b"csrfmiddlewaretoken=xyz&email=a%40b.c")
+    assert first == FixtureStore.key("POST", "http://shop/login", b"email=a%40b.c")
+    assert first != FixtureStore.key("POST", "http://shop/login", b"csrfmiddlewaretoken=abc&email=x%40b.c")
+
+
+def test_key_hashes_other_bodies_unchanged():
+    body = b'{"csrf_token": "abc"}'
+    assert FixtureStore.key("POST", "http://shop/api", body) != FixtureStore.key("POST", "http://shop/api", b"")
+    assert FixtureStore.key("POST", "http://shop/api", body) != FixtureStore.key(
+        "POST", "http://shop/api", b'{"csrf_token": "xyz"}')
+
+
+def test_saved_responses_are_found_again(tmp_path):
+    store = FixtureStore(str(tmp_path))
+    store.use("shopping")
+    store.save("POST", "http://shop/search", b"q=shirt", 200, {"Content-Type": "text/html"}, b"<p>shirt</p>")
+    assert store.lookup("POST", "http://shop/search", b"q=shirt") == (
+        200, {"Content-Type": "text/html"}, b"<p>shirt</p>")
+    assert store.lookup("POST", "http://shop/search", b"q=jeans") is None
+    assert store.lookup("GET", "http://shop/search") is None
+
+
+def test_fixtures_are_kept_per_feature_and_reloaded(tmp_path):
+    store = FixtureStore(str(tmp_path))
+    store.use("shopping")
+    store.save("GET", "http://shop/", b"", 200, {}, b"home")
+    store.use("login")
+    assert store.lookup("GET", "http://shop/") is None
+
+    reopened = FixtureStore(str(tmp_path))
+    reopened.use("shopping")
+    assert reopened.lookup("GET", "http://shop/") == (200, {}, b"home")
+
+
+def test_stores_sharing_a_directory_keep_each_others_fixtures(tmp_path):
+    first, second = FixtureStore(str(tmp_path)), FixtureStore(str(tmp_path))
+    first.use("shopping")
+    second.use("shopping")
+    first.save("GET", "http://shop/", b"", 200, {}, b"home")
+    second.save("GET", "http://shop/cart", b"", 200, {}, b"cart")
+
+    reopened = FixtureStore(str(tmp_path))
+    reopened.use("shopping")
+    assert reopened.lookup("GET", "http://shop/") == (200, {}, b"home")
+    assert reopened.lookup("GET", "http://shop/cart") == (200, {}, b"cart")
+
+
+def test_nothing_is_saved_before_a_feature_is_chosen(tmp_path):
+    store = FixtureStore(str(tmp_path))
+    store.save("GET", "http://shop/", b"", 200, {}, b"home")
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,120 @@
+import pytest
+from behave.parser import parse_feature
+
+from behave_support import schedule
+from behave_support.schedule import Estimate, ScenarioHistory
+
+FILENAME = "features/shop.feature"
+FEATURE = """
+{tags}
+Feature: Shop
+
+  Scenario: cheap
+    Given a step
+
+  Scenario: slow
+    Given a step
+
+  Scenario: flaky
+    Given a step
+
+  Scenario: new
+    Given a step
+"""
+
+
+def _feature(tags=""):
+    return parse_feature(FEATURE.format(tags=tags), filename=FILENAME)
+
+
+def _history(runs):
+    history = ScenarioHistory()
+    for name, results in runs.items():
+        for seconds, status in results:
+            history.record(schedule.scenario_key(FILENAME, name), seconds, status)
+    return history
+
+
+HISTORY = {
+    "cheap": [(1.0, "passed")] * 3,
+    "slow": [(30.0, "passed"), (30.0, "failed")],
+    "flaky": [(5.0, "failed"), (5.0, "passed"), (5.0, "passed")],
+}
+
+
+def _order(feature):
+    return [scenario.name for scenario in feature.scenarios]
+
+
+def test_fail_fast_puts_recent_failures_first_then_cheapest():
+    feature = _feature()
+    schedule.reorder(feature, _history(HISTORY), "fail_fast")
+    # "slow" failed in its latest run, "flaky" two runs ago; "new" has no
+    # history and counts as the median duration, 5 s, tying with "flaky".
+    assert _order(feature) == ["slow", "flaky", "cheap", "new"]
+
+
+def test_longest_first():
+    feature = _feature()
+    schedule.reorder(feature, _history(HISTORY), "longest_first")
+    assert _order(feature) == ["slow", "flaky", "new", "cheap"]
+
+
+@pytest.mark.parametrize("mode, tags", [
+    ("file", ""), ("fail_fast", "@shared_state"), ("longest_first", "@shared_state"),
+])
+def test_file_order_is_kept(mode, tags):
+    feature = _feature(tags)
+    schedule.reorder(feature, _history(HISTORY), mode)
+    assert _order(feature) == ["cheap", "slow", "flaky", "new"]
+
+
+def test_without_history_the_file_order_is_kept():
+    feature = _feature()
+    schedule.reorder(feature, ScenarioHistory(), "fail_fast")
+    assert _order(feature) == ["cheap", "slow", "flaky", "new"]
+
+
+def test_failure_score_halves_with_every_run_since():
+    history = _history({"flaky": [(1.0, "failed"), (1.0, "passed"), (1.0, "failed")]})
+    assert history.failure_score(schedule.scenario_key(FILENAME, "flaky")) == 1.25
+
+
+def test_outlines_are_estimated_from_all_their_rows():
+    feature = parse_feature("""
+Feature: Outline
+  Scenario Outline: buy <item>
+    Given I buy <item>
+
+    Examples:
+      | item  |
+      | shirt |
+      | jeans |
+""", filename=FILENAME)
+    outline = feature.scenarios[0]
+    history = _history({row.name: [(2.0, "passed")] for row in outline.scenarios})
+    keys = [schedule.scenario_key(FILENAME, row.name) for row in outline.scenarios]
+    assert Estimate(history, keys, 0.0).duration == 4.0
+
+
+def test_lpt_shards_balance_the_expected_load():
+    history = ScenarioHistory()
+    units = [["a:1"], ["a:2"], ["a:3"], ["a:4"]]
+    estimates = [Estimate(history, [], 0.0) for _ in units]
+    for estimate, duration in zip(estimates, [8.0, 7.0, 4.0, 3.0]):
+        estimate.duration = duration
+    assert schedule.lpt_shards(units, estimates, 2) == [["a:1", "a:4"], ["a:2", "a:3"]]
+    # Without history the unit count decides.
+    for estimate in estimates:
+        estimate.duration = 0.0
+    assert schedule.lpt_shards(units, estimates, 2) == [["a:1", "a:3"], ["a:2", "a:4"]]
+
+
+def test_save_merges_with_the_file(tmp_path):
+    path = str(tmp_path / "history.json")
+    first, second = ScenarioHistory(path), ScenarioHistory(path)
+    first.record("a", 1.0, "passed")
+    second.record("a", 2.0, "failed")
+    first.save()
+    second.save()
+    assert [run["status"] for run in ScenarioHistory(path).runs["a"]] == ["passed", "failed"]
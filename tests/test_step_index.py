@@ -0,0 +1,112 @@
+import pytest
+from behave import matchers
+from behave.model import Step
+from behave.step_registry import StepRegistry
+
+from behave_support import step_index
+
+
+def _definition(name):
+    def step(context, **kwargs):
+        pass
+    step.__name__ = name
+    return step
+
+
+# (keyword, pattern, regex) in registration order; several share prefixes, and
+# "step" definitions are candidates for every step type.
+DEFINITIONS = [
+    ("given", "I navigate to the Products page", False),
+    ("given", "I navigate to the {page} page", False),
+    ("when", 'I click the "X" button to remove the item', False),
+    ("when", "I click {what}", False),
+    ("when", r"I (?:hover|wait) over (?P<thing>.+)", True),
+    ("when", r"^I scroll? (?P<direction>up|down)$", True),
+    ("then", "I should see {count:d} item in the cart", False),
+    ("then", 'I should see "{text}" in the results', False),
+    ("step", "I wait {seconds:d} seconds", False),
+    ("step", r"(?:the|a) page (?P<name>\w+) is open", True),
+]
+
+STEPS = [
+    ("given", "I navigate to the Products page"),
+    ("given", "I navigate to the Cart page"),
+    ("given", "I wait 3 seconds"),
+    ("when", 'I click the "X" button to remove the item'),
+    ("when", "I click Continue Shopping button"),
+    ("when", "i CLICK something"),
+    ("when", "I hover over the first product"),
+    ("when", "I scrol down"),
+    ("when", "I scroll up"),
+    ("when", "I wait 3 seconds"),
+    ("when", "the page cart is open"),
+    ("when", "a page cart is open"),
+    ("then", "I should see 1 item in the cart"),
+    ("then", 'I should see "SEARCHED PRODUCTS" in the results'),
+    ("then", "I should see nothing"),
+    ("then", "nothing matches this"),
+    ("then", ""),
+]
+
+
+@pytest.fixture
+def registry():
+    registry = StepRegistry()
+    for number, (keyword, pattern, regex) in enumerate(DEFINITIONS):
+        func = _definition("step_{}".format(number))
+        if regex:
+            registry.steps[keyword].append(matchers.RegexMatcher(func, pattern))
+        else:
+            registry.steps[keyword].append(matchers.ParseMatcher(func, pattern))
+    return registry
+
+
+def _describe(match):
+    if match is None:
+        return None
+    return match.func.__name__, [(a.name, a.value) for a in match.arguments]
+
+
+@pytest.mark.parametrize("step_type, text", STEPS)
+def test_lookup_matches_behave(registry, step_type, text):
+    step = Step("test.feature", 1, step_type.title(), step_type, text)
+    expected = _describe(registry.find_match(step))
+    step_index.install(registry)
+    assert _describe(registry.find_match(step)) == expected
+    # Served from the cache the second time, still the same.
+    assert _describe(registry.find_match(step)) == expected
+
+
+def test_repeated_steps_are_matched_once(registry):
+    index = step_index.install(registry)
+    step = Step("test.feature", 1, "When", "when", "I click Continue Shopping button")
+    for _ in range(3):
+        registry.find_match(step)
+    assert (index.misses, index.hits) == (1, 2)
+
+
+def test_new_definitions_invalidate_the_index(registry):
+    step_index.install(registry)
+    step = Step("test.feature", 1, "Then", "then", "the cart total is 10")
+    assert registry.find_match(step) is None
+    registry.add_step_definition("then", "the cart total is {amount:d}", _definition("total"))
+    assert _describe(registry.find_match(step)) == ("total", [("amount", 10)])
+
+
+@pytest.mark.parametrize("pattern, prefix", [
+    ("I navigate to the {page} page", "i navigate to the "),
+    ("no placeholders", "no placeholders"),
+])
+def test_parse_prefix(pattern, prefix):
+    assert step_index.literal_prefix(matchers.ParseMatcher(None, pattern)) == prefix
+
+
+@pytest.mark.parametrize("pattern, prefix", [
+    (r"^I scroll (?P<d>\w+)$", "i scroll "),
+    (r"I scroll? down", "i scrol"),
+    (r"I click (\w+)", "i click "),
+    # An alternation may start anywhere, so it gets no prefix at all.
+    (r"^I scroll (?P<d>up|down)$", ""),
+])
+def test_regex_prefix(pattern, prefix):
+    assert step_index.literal_prefix(matchers.RegexMatcher(None, pattern)) == prefix
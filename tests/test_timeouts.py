@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from behave_support import timeouts
+from behave_support.timeouts import TimeoutPolicy
+
+
+def _policy(samples, **kwargs):
+    policy = TimeoutPolicy(**kwargs)
+    for seconds in samples:
+        policy.record("label", seconds, True)
+    return policy
+
+
+def test_few_samples_keep_the_step_timeout():
+    assert _policy([0.5] * 4).timeout_for("label", 10) == 10
+    assert _policy([]).timeout_for("other", 7) == 7
+
+
+def test_timeout_is_p95_times_headroom():
+    # Nearest-rank p95 of 1..20 tenths is 1.9 s.
+    policy = _policy([n / 10.0 for n in range(1, 21)], headroom=2.0, minimum=1.0)
+    assert policy.timeout_for("label", 10) == pytest.approx(3.8)
+
+
+def test_timeout_stays_between_minimum_and_step_timeout():
+    assert _policy([0.1] * 10, minimum=1.0).timeout_for("label", 10) == 1.0
+    assert _policy([9.0] * 10).timeout_for("label", 10) == 10
+
+
+def test_timed_out_waits_let_the_timeout_grow_again():
+    policy = _policy([4.0] * 10, minimum=1.0)
+    assert policy.timeout_for("label", 20) == 6.0
+    # The site got slower: every wait now runs into the learned timeout.
+    for _ in range(3):
+        policy.record("label", policy.timeout_for("label", 20), False)
+    assert policy.timeout_for("label", 20) == 20
+
+
+def test_waits_cut_short_by_the_budget_are_not_recorded(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(timeouts.time, "time", lambda: clock[0])
+    policy = TimeoutPolicy(budget=30)
+    policy.start_scenario()
+    clock[0] += 31
+    policy.record("label", 0.0, False)
+    assert "label" not in policy.samples
+
+
+class _Userdata(dict):
+
+    def getbool(self, name, default=False):
+        return self.get(name, "yes" if default else "no") == "yes"
+
+
+def test_adaptive_timeouts_are_opt_in(tmp_path):
+    assert timeouts.from_userdata(_Userdata()) is None
+    policy = timeouts.from_userdata(_Userdata(adaptive_timeouts="yes", timeout_history=str(tmp_path / "w.json")))
+    assert policy.minimum == timeouts.MINIMUM
+
+
+def test_samples_are_capped():
+    policy = _policy(range(timeouts.MAX_SAMPLES + 10))
+    assert policy.samples["label"] == [float(n) for n in range(10, timeouts.MAX_SAMPLES + 10)]
+
+
+def test_spent_budget_cuts_every_wait_short(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(timeouts.time, "time", lambda: clock[0])
+    policy = TimeoutPolicy(budget=30)
+    policy.start_scenario()
+    assert policy.timeout_for("label", 10) == 10
+    clock[0] += 25
+    assert policy.timeout_for("label", 10) == pytest.approx(5)
+    clock[0] += 10
+    assert policy.timeout_for("label", 10) == 0.0
+
+
+def test_save_merges_with_what_other_workers_wrote(tmp_path):
+    path = str(tmp_path / "waits.json")
+    first, second = TimeoutPolicy(path), TimeoutPolicy(path)
+    first.record("a", 1.0, True)
+    second.record("a", 2.0, True)
+    second.record("b", 3.0, True)
+    first.save()
+    second.save()
+    with open(path) as f:
+        assert json.load(f) == {"a": [1.0, 2.0], "b": [3.0]}
+    assert TimeoutPolicy(path).samples["a"] == [1.0, 2.0]
+    # Nothing new, nothing written; no temporary files are left behind.
+    second.save()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["waits.json", "waits.json.lock"]
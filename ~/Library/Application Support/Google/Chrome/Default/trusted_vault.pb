@@ -1,2 +0,0 @@
-
- 0ba4067c95d8d92744702afdd1697107,FMha/UXuYCgxOs6kA5eqLYr/3JE3lSTZCKkpGExmGqM=
\ No newline at end of file
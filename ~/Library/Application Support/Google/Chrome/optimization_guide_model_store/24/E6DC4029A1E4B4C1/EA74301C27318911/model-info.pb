@@ -1,5 +0,0 @@
-Ð 2m
-`type.googleapis.com/google.internal.chrome.optimizationguide.v1.OnDeviceTailSuggestModelMetadata	
-@:
-vocab_en-us.txt:"
- enus_denylist_encoded_241007.txt
\ No newline at end of file